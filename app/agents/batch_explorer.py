@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.agents.startup_explorer_agent import StartupExplorerAgent
+from app.core.workers import run_sync
+
+load_dotenv()
+
+# 동시에 실행할 회사별 파이프라인 수
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "3"))
+# 회사별 파이프라인 안에서 동시에 실행할 분석 에이전트 수
+BATCH_AGENT_CONCURRENCY = int(os.getenv("BATCH_AGENT_CONCURRENCY", "2"))
+# 중복 회사가 선정되었을 때 다시 선정을 시도하는 횟수
+BATCH_DISCOVERY_ATTEMPTS = int(os.getenv("BATCH_DISCOVERY_ATTEMPTS", "3"))
+# CLI 실행 결과를 추가 기록하고 재실행 시 완료한 회사를 건너뛰는 데 쓰는 파일
+BATCH_OUTPUT_PATH = os.path.join("output", "batch_results.jsonl")
+# API 백그라운드 작업은 작업마다 별도 파일에 기록 (output/batch_jobs/<job_id>.jsonl)
+BATCH_JOB_OUTPUT_DIR = os.path.join("output", "batch_jobs")
+
+RESULT_KEYS = ["exploration", "info_perform", "competitor", "market", "invest", "report"]
+
+
+def normalize_company_name(name: str) -> str:
+    """중복 판정용 회사명 정규화 (대소문자, 공백, 괄호 안 부가 설명 무시)"""
+    name = re.sub(r"\(.*?\)", "", name or "")
+    return re.sub(r"\s+", "", name).lower()
+
+
+def load_finished_companies(output_path: str) -> set:
+    """이전 실행에서 이미 분석을 마친 회사 목록 (중단 후 재실행 시 건너뜀)"""
+    finished = set()
+    if not output_path or not os.path.exists(output_path):
+        return finished
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 비정상 종료로 마지막 줄이 잘린 경우
+                continue
+            if record.get("status") == "succeeded":
+                finished.add(normalize_company_name(record["company"]))
+    return finished
+
+
+class BatchExplorer:
+    """
+    여러 스타트업의 투자 검토 파이프라인을 동시에 실행
+
+    - 회사별 파이프라인은 max_concurrency개까지 동시에 실행
+    - 선정된 회사 목록을 공유하여 같은 회사를 중복 분석하지 않음
+    - 회사 하나가 끝날 때마다 결과를 JSONL 파일에 추가 기록
+    - resume=True이면 같은 파일에 이전 실행에서 완료한 회사는 건너뜀 (CLI 재실행용)
+    - 검색 캐시와 LLM 캐시는 프로세스 전체에서 공유됨
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        agent_concurrency: int = BATCH_AGENT_CONCURRENCY,
+        output_path: Optional[str] = BATCH_OUTPUT_PATH,
+        on_company: Optional[Callable[[str, str], None]] = None,
+        resume: bool = False,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.agent_concurrency = max(1, agent_concurrency)
+        self.output_path = output_path
+        self.on_company = on_company
+        self.found_startups: List[str] = []
+        self.resume = resume and bool(output_path)
+        self._seen: set = set()
+        self._resume_loaded = False
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._discovery_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    def _notify(self, company: str, status: str):
+        if self.on_company is not None:
+            self.on_company(company, status)
+
+    def _claim(self, company: str) -> bool:
+        key = normalize_company_name(company)
+        if not key or key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def _append(self, record: Dict[str, Any]):
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _write(self, record: Dict[str, Any]):
+        if not self.output_path:
+            return
+        async with self._write_lock:
+            # 파일 쓰기와 fsync가 이벤트 루프를 막지 않도록 워커 풀에서 실행
+            await run_sync(self._append, record)
+
+    async def _discover(self) -> Optional[StartupExplorerAgent]:
+        # 선정 결과가 다음 선정 프롬프트({list})에 반영되도록 선정 단계만 순차 실행
+        async with self._discovery_lock:
+            for _ in range(BATCH_DISCOVERY_ATTEMPTS):
+                agent = StartupExplorerAgent(found_startups=self.found_startups)
+                company = await agent.discover_startup()
+                if self._claim(company):
+                    return agent
+                logging.info(f"이미 분석한 회사가 선정되어 다시 선정합니다: {company}")
+        return None
+
+    async def _run(self, agent: StartupExplorerAgent) -> Dict[str, Any]:
+        company = agent.startup_name
+        self._notify(company, "running")
+        started = time.time()
+        try:
+            result = await agent.supervisor(max_concurrency=self.agent_concurrency)
+            record = {
+                "company": company,
+                "status": "succeeded",
+                "elapsed": round(time.time() - started, 1),
+                "result": dict(zip(RESULT_KEYS, result)),
+            }
+        except Exception as e:
+            logging.error(f"{company} 분석 실패: {e}", exc_info=True)
+            record = {
+                "company": company,
+                "status": "failed",
+                "elapsed": round(time.time() - started, 1),
+                "error": getattr(e, "detail", None) or str(e),
+            }
+        await self._write(record)
+        self._notify(company, "completed" if record["status"] == "succeeded" else "failed")
+        return record
+
+    async def _run_target(self, company: str) -> Dict[str, Any]:
+        async with self._semaphore:
+            return await self._run(StartupExplorerAgent(startup_name=company, found_startups=self.found_startups))
+
+    async def _run_discovered(self) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            started = time.time()
+            try:
+                agent = await self._discover()
+            except Exception as e:
+                # 선정 실패는 해당 슬롯만 실패로 기록하고 다른 회사 분석은 계속 진행
+                logging.error(f"스타트업 선정 실패: {e}", exc_info=True)
+                record = {
+                    "company": "",
+                    "status": "failed",
+                    "elapsed": round(time.time() - started, 1),
+                    "error": getattr(e, "detail", None) or str(e),
+                }
+                await self._write(record)
+                return record
+            if agent is None:
+                return None
+            return await self._run(agent)
+
+    async def run(self, targets: Optional[List[str]] = None, count: int = 0) -> List[Dict[str, Any]]:
+        """
+        Args:
+            targets: 분석할 회사명 목록 (중복 및 resume 시 이전에 완료한 회사는 제외)
+            count: 추가로 탐색하여 분석할 회사 수
+
+        Returns:
+            회사별 결과 레코드 목록 (파일에 기록된 것과 동일)
+        """
+        if self.resume and not self._resume_loaded:
+            # 이전 결과 파일은 클 수 있으므로 이벤트 루프 밖에서 읽음
+            self._seen |= await run_sync(load_finished_companies, self.output_path)
+            self._resume_loaded = True
+
+        tasks = []
+        for company in targets or []:
+            if self._claim(company):
+                self.found_startups.append(company)
+                tasks.append(self._run_target(company))
+            else:
+                logging.info(f"중복 또는 이미 완료된 회사 건너뜀: {company}")
+        tasks.extend(self._run_discovered() for _ in range(count))
+
+        records = await asyncio.gather(*tasks)
+        return [record for record in records if record is not None]
+
+
+async def explore_startups_batch(
+    targets: Optional[List[str]] = None,
+    count: int = 0,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    output_path: Optional[str] = BATCH_OUTPUT_PATH,
+    on_company: Optional[Callable[[str, str], None]] = None,
+    resume: bool = False,
+) -> List[Dict[str, Any]]:
+    """여러 스타트업을 동시에 분석 (BatchExplorer 참고)"""
+    explorer = BatchExplorer(
+        max_concurrency=max_concurrency, output_path=output_path, on_company=on_company, resume=resume
+    )
+    return await explorer.run(targets=targets, count=count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 스타트업 투자 검토를 동시에 실행")
+    parser.add_argument("targets", nargs="*", help="분석할 회사명 (생략하면 --count만큼 탐색)")
+    parser.add_argument("--count", type=int, default=0, help="추가로 탐색하여 분석할 회사 수")
+    parser.add_argument("--concurrency", type=int, default=BATCH_MAX_CONCURRENCY, help="동시에 분석할 회사 수")
+    parser.add_argument("--output", default=BATCH_OUTPUT_PATH, help="결과를 추가 기록할 JSONL 파일")
+    parser.add_argument("--no-resume", action="store_true", help="결과 파일에 이미 완료로 기록된 회사도 다시 분석")
+    args = parser.parse_args()
+
+    if not args.targets and args.count <= 0:
+        parser.error("회사명을 지정하거나 --count를 1 이상으로 지정하세요.")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from app.core.llm_cache import configure_llm_cache
+
+    configure_llm_cache()
+    records = asyncio.run(
+        explore_startups_batch(
+            targets=args.targets,
+            count=args.count,
+            max_concurrency=args.concurrency,
+            output_path=args.output,
+            resume=not args.no_resume,
+        )
+    )
+    succeeded = sum(1 for record in records if record["status"] == "succeeded")
+    print(f"완료: {succeeded}/{len(records)}개 회사 (결과: {args.output})")
+
+
+if __name__ == "__main__":
+    main()
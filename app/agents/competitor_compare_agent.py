@@ -2,24 +2,25 @@ import logging
 import os
 import re
 from dotenv import load_dotenv
+from app.core.context_packing import pack_search_results
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain_community.tools.tavily_search import TavilySearchResults
+from app.core.search_tool import get_search_tool
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.1,
     openai_api_key=OPENAI_API_KEY
 )
 
-tavily = TavilySearchResults(max_results=5)
+tavily = get_search_tool("competitor", max_results=5)
 
 # 프롬프트 템플릿
 competitor_analysis_prompt = PromptTemplate.from_template(
@@ -70,19 +71,19 @@ async def compare_competitors(data: str):
     try:
         # 1. 경쟁사 리스트업
         competitor_query = f"{company_name} 경쟁사 리스트 스타트업"
-        competitor_search_result = tavily.invoke(competitor_query)
-        competitor_list = competitor_list_chain.invoke({
+        competitor_search_result = await tavily.ainvoke(competitor_query)
+        competitor_list = await competitor_list_chain.ainvoke({
             "company_name": company_name,
-            "text": competitor_search_result
+            "text": pack_search_results(competitor_search_result, competitor_query, "competitor")
         })
         logging.info(f"Competitor List Result: {competitor_list}")
         
         # 2. 경쟁사 비교 분석
         competitor_analysis_query = f"{company_name} 경쟁사 비교 분석 차별점 시장점유율"
-        comparison_search_result = tavily.invoke(competitor_analysis_query)
-        competitor_analysis = competitor_analysis_chain.invoke({
+        comparison_search_result = await tavily.ainvoke(competitor_analysis_query)
+        competitor_analysis = await competitor_analysis_chain.ainvoke({
             "company_name": company_name,
-            "text": comparison_search_result
+            "text": pack_search_results(comparison_search_result, competitor_analysis_query, "competitor")
         })
         logging.info(f"Competitor Analysis Result: {competitor_analysis}")
         
@@ -1,31 +1,32 @@
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Dict, Any, List, Union
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Union, AsyncIterator
 from dotenv import load_dotenv
+from app.core.metrics import track_operation
+from app.core.workers import run_sync
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 import json
 
-import re
 from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_JUSTIFY
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 # 환경 변수 로드
 load_dotenv()
 
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini", 
     temperature=0.1, 
-    openai_api_key=OPENAI_API_KEY
+    openai_api_key=OPENAI_API_KEY,
+    # 스트리밍 응답에도 토큰 사용량을 포함 (메트릭 집계용)
+    stream_usage=True
 )
 
 # 보고서 생성 프롬프트 - 각 Agent의 결과가 주입될 위치 명시
@@ -104,10 +105,10 @@ report_prompt = PromptTemplate.from_template(report_template)
 output_parser = StrOutputParser()
 report_generation_chain = report_prompt | model | output_parser
 
-async def create_final_report(results_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def build_report_inputs(results_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    여러 에이전트의 결과를 종합하여 최종 투자 보고서를 생성
-    
+    여러 에이전트의 결과를 보고서 프롬프트 변수로 정리
+
     Args:
         results_data: 여러 에이전트의 결과가 담긴 리스트
         [0]: 스타트업 탐색 에이전트의 결과
@@ -116,48 +117,59 @@ async def create_final_report(results_data: List[Dict[str, Any]]) -> Dict[str, A
         [3]: 시장성 평가 에이전트의 결과
         [4]: 기술 요약 에이전트의 결과
         [5]: 투자 판단 에이전트의 결과
+    """
+    # 입력 데이터 정리
+    exploration_result = results_data[0]
+    perform_info = results_data[1]
+    competitor_info = results_data[2]
+    market_info = results_data[3]
+    tech_info = results_data[4]
+    investment_analysis_result = results_data[5]
+
+    exploration_summary = exploration_result.get("기업 정보 요약", "정보 없음")
+
+    # tech_info에서 두 정보를 별도로 추출
+    tech_summary = tech_info.get("기술 요약", "정보 없음")
+
+    # perform_info에서 두 정보를 별도로 추출
+    perform_summary = perform_info.get("기업 실적 요약", "정보 없음")
+    founder_summary = perform_info.get("창업자 정보 요약", "정보 없음") 
+
+    # competitor_info에서 두 정보를 별도로 추출
+    competitor_list = competitor_info.get("주요 경쟁사 목록", "정보 없음")
+    competitor_analysis = competitor_info.get("경쟁사 비교 분석", "정보 없음")
+
+    market_summary = market_info.get("시장성 종합 분석", "정보 없음")
+
+    investment_analysis = investment_analysis_result.get("투자 판단 보고서", "정보 없음")
+
+    return {
+        "exploration_summary": exploration_summary,
+        "perform_summary": perform_summary,
+        "tech_summary": tech_summary,
+        "founder_summary": founder_summary,
+        "competitor_summary": competitor_analysis,
+        "competitor_list": competitor_list,
+        "market_summary": market_summary,
+        "investment_analysis": investment_analysis
+    }
+
+async def create_final_report(results_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    여러 에이전트의 결과를 종합하여 최종 투자 보고서를 생성
+    
+    Args:
+        results_data: 여러 에이전트의 결과가 담긴 리스트 (순서는 build_report_inputs 참고)
 
     Returns:
         Dict[str, Any]: 최종 보고서 및 관련 정보
     """
     try:
-        # 입력 데이터 정리
-        exploration_result = results_data[0]
-        perform_info = results_data[1]
-        competitor_info = results_data[2]
-        market_info = results_data[3]
-        tech_info = results_data[4]
-        investment_analysis_result = results_data[5]
-
-        exploration_summary = exploration_result.get("기업 정보 요약", "정보 없음")
-
-        # tech_info에서 두 정보를 별도로 추출
-        tech_summary = tech_info.get("기술 요약", "정보 없음")
-
-        # perform_info에서 두 정보를 별도로 추출
-        perform_summary = perform_info.get("기업 실적 요약", "정보 없음")
-        founder_summary = perform_info.get("창업자 정보 요약", "정보 없음") 
-
-        # competitor_info에서 두 정보를 별도로 추출
-        competitor_list = competitor_info.get("주요 경쟁사 목록", "정보 없음")
-        competitor_analysis = competitor_info.get("경쟁사 비교 분석", "정보 없음")
-
-        market_summary = market_info.get("시장성 종합 분석", "정보 없음")
-
-        investment_analysis = investment_analysis_result.get("투자 판단 보고서", "정보 없음")
+        report_inputs = build_report_inputs(results_data)
 
         logging.info("최종 보고서 작성 시작")
         # 2. 최종 보고서 생성
-        final_report = await report_generation_chain.ainvoke({
-            "exploration_summary": exploration_summary,
-            "perform_summary": perform_summary,
-            "tech_summary": tech_summary,
-            "founder_summary": founder_summary,
-            "competitor_summary": competitor_analysis,
-            "competitor_list": competitor_list,
-            "market_summary": market_summary,
-            "investment_analysis": investment_analysis
-        })
+        final_report = await report_generation_chain.ainvoke(report_inputs)
         logging.info("최종 보고서 작성 완료")
                 
         return final_report
@@ -166,34 +178,166 @@ async def create_final_report(results_data: List[Dict[str, Any]]) -> Dict[str, A
         logging.error(f"보고서 생성 중 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Report Generation Error: {str(e)}")
 
+async def stream_final_report(results_data: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    최종 투자 보고서를 토큰 단위로 생성 (create_final_report의 스트리밍 버전)
+
+    LangChain의 astream은 LLM 캐시를 거치지 않으므로 항상 모델을 호출함
+    전체 보고서가 필요하면 호출 측에서 토큰을 이어 붙여 사용
+    """
+    try:
+        report_inputs = build_report_inputs(results_data)
+
+        logging.info("최종 보고서 스트리밍 시작")
+        # 스트리밍 도중에는 재시도할 수 없으므로 업스트림 한도만 적용
+        async for token in report_generation_chain.astream(report_inputs):
+            yield token
+        logging.info("최종 보고서 스트리밍 완료")
+
+    except Exception as e:
+        logging.error(f"보고서 생성 중 오류 발생: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Report Generation Error: {str(e)}")
+
+# 보고서 PDF용 나눔고딕 폰트 (실행 위치와 무관하도록 프로젝트 루트 기준 경로 사용)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPORT_FONT_PATH = os.getenv(
+    "REPORT_FONT_PATH", os.path.join(PROJECT_ROOT, "Nanum_Gothic", "NanumGothic-Regular.ttf")
+)
+REPORT_BOLD_FONT_PATH = os.getenv(
+    "REPORT_BOLD_FONT_PATH", os.path.join(PROJECT_ROOT, "Nanum_Gothic", "NanumGothic-Bold.ttf")
+)
+REPORT_FONT_NAME = "NanumGothic"
+
+# 같은 보고서를 다시 내려받을 때 재사용할 PDF 캐시 크기
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "32"))
+
+_pdf_styles = None
+_pdf_styles_lock = threading.Lock()
+_pdf_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+# 같은 보고서를 동시에 요청한 경우 한 번만 렌더링하도록 진행 중인 작업 공유
+_pdf_in_flight: Dict[str, "asyncio.Task[bytes]"] = {}
+# 렌더링 작업별로 아직 결과를 기다리는(취소되지 않은) 요청 수
+_pdf_waiters: Dict["asyncio.Task[bytes]", int] = {}
+
+
+def get_pdf_styles():
+    """나눔고딕 폰트 등록과 보고서 스타일 생성은 프로세스에서 한 번만 수행"""
+    global _pdf_styles
+    with _pdf_styles_lock:
+        if _pdf_styles is not None:
+            return _pdf_styles
+
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_JUSTIFY
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        pdfmetrics.registerFont(TTFont(REPORT_FONT_NAME, REPORT_FONT_PATH))
+        # 굵은 글꼴 파일이 있으면 <b>에 사용하고, 없으면 일반 글꼴로 대체
+        bold_font_name = REPORT_FONT_NAME
+        if os.path.exists(REPORT_BOLD_FONT_PATH):
+            bold_font_name = f"{REPORT_FONT_NAME}-Bold"
+            pdfmetrics.registerFont(TTFont(bold_font_name, REPORT_BOLD_FONT_PATH))
+        pdfmetrics.registerFontFamily(
+            REPORT_FONT_NAME,
+            normal=REPORT_FONT_NAME,
+            bold=bold_font_name,
+            italic=REPORT_FONT_NAME,
+            boldItalic=bold_font_name,
+        )
+        logging.info(f"폰트 등록 성공: {REPORT_FONT_NAME} ({REPORT_FONT_PATH})")
+        korean_font_name = REPORT_FONT_NAME
+
+        # 스타일 정의
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle(
+            name='ReportTitle',
+            parent=styles['Heading1'],
+            fontName=korean_font_name,
+            fontSize=18,
+            alignment=1,  # 가운데 정렬
+            spaceAfter=20
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportHeading',
+            parent=styles['Heading2'],
+            fontName=korean_font_name,
+            fontSize=14,
+            spaceBefore=12,
+            spaceAfter=6
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportBody',
+            parent=styles['Normal'],
+            fontName=korean_font_name,
+            fontSize=10,
+            leading=14,  # 줄 간격
+            alignment=TA_JUSTIFY,  # 양쪽 정렬
+            spaceAfter=6
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportSubheading',
+            parent=styles['Heading3'],
+            fontName=korean_font_name,
+            fontSize=12,
+            spaceBefore=8,
+            spaceAfter=4
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportList',
+            parent=styles['Normal'],
+            fontName=korean_font_name,
+            bulletFontName=korean_font_name,
+            fontSize=10,
+            leading=14,
+            leftIndent=20,  # 들여쓰기
+            spaceAfter=4
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportTableCell',
+            parent=styles['Normal'],
+            fontName=korean_font_name,
+            fontSize=9,
+            leading=12
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportTableHeader',
+            parent=styles['ReportTableCell'],
+            fontName=bold_font_name
+        ))
+
+        styles.add(ParagraphStyle(
+            name='ReportCode',
+            parent=styles['Code'],
+            fontName=korean_font_name,
+            fontSize=9,
+            leading=12,
+            backColor='#f5f5f5',
+            borderPadding=4,
+            spaceBefore=4,
+            spaceAfter=8
+        ))
+
+        _pdf_styles = styles
+        return _pdf_styles
+
+
 def convert_report_to_pdf(content: str) -> bytes:
     """Markdown 형식의 보고서 내용을 PDF 바이트로 변환합니다."""
-    # 마크다운 기호 제거 함수
-    def remove_markdown(text):
-        # 제목 기호(#) 제거
-        text = re.sub(r'^#+\s+', '', text)
-        # 볼드체(**) 제거
-        text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-        # 이탤릭체(*) 제거
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        # 리스트 기호 제거 (*, -, +)
-        text = re.sub(r'^[*\-+]\s+', '', text)
-        # 링크 텍스트만 남기기 [텍스트](링크)
-        text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
-        # 코드 블록 기호(```) 제거
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-        # 인라인 코드(`) 제거
-        text = re.sub(r'`(.+?)`', r'\1', text)
-        return text
-    
-    # 나눔고딕 폰트 경로 직접 지정
-    font_path = "./Nanum_Gothic/NanumGothic-Regular.ttf"
-    font_name = "NanumGothic"
-    
-    pdfmetrics.registerFont(TTFont(font_name, font_path))
-    print(f"폰트 등록 성공: {font_name} ({font_path})")
-    korean_font_name = font_name
-    
+    # ReportLab은 PDF 다운로드 시에만 필요하므로 지연 import
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+    from app.core.markdown_flowables import markdown_to_flowables
+
+    styles = get_pdf_styles()
+
     # PDF 생성
     buffer = BytesIO()
     doc = SimpleDocTemplate(
@@ -204,96 +348,9 @@ def convert_report_to_pdf(content: str) -> bytes:
         leftMargin=50, 
         rightMargin=50
     )
-    
-    # 스타일 정의
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='ReportTitle',
-        parent=styles['Heading1'],
-        fontName=korean_font_name,
-        fontSize=18,
-        alignment=1,  # 가운데 정렬
-        spaceAfter=20
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ReportHeading',
-        parent=styles['Heading2'],
-        fontName=korean_font_name,
-        fontSize=14,
-        spaceBefore=12,
-        spaceAfter=6
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ReportBody',
-        parent=styles['Normal'],
-        fontName=korean_font_name,
-        fontSize=10,
-        leading=14,  # 줄 간격
-        alignment=TA_JUSTIFY,  # 양쪽 정렬
-        spaceAfter=6
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ReportList',
-        parent=styles['Normal'],
-        fontName=korean_font_name,
-        fontSize=10,
-        leading=14,
-        leftIndent=20,  # 들여쓰기
-        spaceAfter=4
-    ))
-
-    story = []
-    lines = content.split('\n')
-    
-    title_added = False
-    for line in lines:
-        stripped_line = line.strip()
-        
-        if not stripped_line:
-            story.append(Spacer(1, 6))
-            continue
-
-        # 구조 확인 (마크다운 기호 제거 전에)
-        is_title = False
-        is_heading = False
-        is_list_item = False
-        
-        # 제목 처리 (첫 번째 '**'로 시작하고 끝나는 줄)
-        if stripped_line.startswith('**') and stripped_line.endswith('**') and not title_added:
-            is_title = True
-        # 부제목 처리 (예: '**숫자.**' 패턴)
-        elif re.match(r'\*\*\d+\.\s*.*?\*\*', stripped_line):
-            is_heading = True
-        # 부제목 처리 (예: '## 제목' 패턴)
-        elif stripped_line.startswith('## '):
-            is_heading = True
-        # 목록 항목 처리 (예: '* ', '- ')
-        elif stripped_line.startswith('* ') or stripped_line.startswith('- '):
-            is_list_item = True
-        
-        # 마크다운 기호 제거
-        cleaned_line = remove_markdown(stripped_line)
-        
-        # 특수 문자 처리 (ReportLab에서 처리할 수 없는 문자 제거)
-        cleaned_line = cleaned_line.replace('&', '&amp;')
-        cleaned_line = cleaned_line.replace('<', '&lt;')
-        cleaned_line = cleaned_line.replace('>', '&gt;')
-
-        # 구조에 따른 처리
-        if is_title:
-            element = Paragraph(cleaned_line, styles['ReportTitle'])
-            title_added = True
-        elif is_heading:
-            element = Paragraph(cleaned_line, styles['ReportHeading'])
-        elif is_list_item:
-            element = Paragraph(cleaned_line, styles['ReportList'])
-        else:
-            element = Paragraph(cleaned_line, styles['ReportBody'])
-
-        story.append(element)
+
+    # 제목/소제목/문단/중첩 목록/표/코드 블록을 한 번에 훑어 flowable로 변환
+    story = markdown_to_flowables(content, styles, doc.width)
 
     try:
         doc.build(story)
@@ -301,5 +358,72 @@ def convert_report_to_pdf(content: str) -> bytes:
         buffer.close()
         return pdf_bytes
     except Exception as e:
-        print(f"PDF 빌드 중 오류 발생: {e}")
-        raise
\ No newline at end of file
+        logging.error(f"PDF 빌드 중 오류 발생: {e}")
+        raise
+
+
+def _pdf_cache_key(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_cached_pdf(content: str) -> Union[bytes, None]:
+    key = _pdf_cache_key(content)
+    with _pdf_cache_lock:
+        pdf_bytes = _pdf_cache.get(key)
+        if pdf_bytes is not None:
+            _pdf_cache.move_to_end(key)
+        return pdf_bytes
+
+
+def _store_pdf(key: str, pdf_bytes: bytes):
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf_bytes
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_MAX_ENTRIES:
+            _pdf_cache.popitem(last=False)
+
+
+async def _render_and_store(key: str, content: str) -> bytes:
+    with track_operation("pdf_render"):
+        pdf_bytes = await run_sync(convert_report_to_pdf, content)
+    _store_pdf(key, pdf_bytes)
+    return pdf_bytes
+
+
+def _finish_render(key: str, task: "asyncio.Task[bytes]"):
+    _pdf_in_flight.pop(key, None)
+    waiters = _pdf_waiters.pop(task, 0)
+    if task.cancelled():
+        return
+    # 예외는 항상 꺼내 두고, 기다리던 요청이 모두 취소되어 아무도 받지 못한 경우에만 기록
+    # (남아 있는 요청이 있으면 그쪽에서 예외를 받아 처리/기록함)
+    error = task.exception()
+    if error is not None and waiters == 0:
+        logging.error(f"PDF 렌더링 실패: {error}")
+
+
+async def render_report_pdf(content: str) -> bytes:
+    """
+    보고서 PDF를 워커 풀에서 렌더링 (이벤트 루프를 막지 않음)
+
+    보고서 텍스트의 해시로 결과를 캐시하므로 같은 보고서를 다시 내려받으면 바로 반환하고,
+    같은 보고서를 동시에 요청하면 렌더링은 한 번만 수행됨
+    """
+    pdf_bytes = get_cached_pdf(content)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    key = _pdf_cache_key(content)
+    task = _pdf_in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_render_and_store(key, content))
+        _pdf_in_flight[key] = task
+        task.add_done_callback(lambda done: _finish_render(key, done))
+    _pdf_waiters[task] = _pdf_waiters.get(task, 0) + 1
+    # 요청이 취소되어도 렌더링은 끝까지 진행되어 캐시에 저장됨
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if not task.done() and task in _pdf_waiters:
+            _pdf_waiters[task] -= 1
+        raise
@@ -2,23 +2,24 @@ import logging
 import os
 import re
 from dotenv import load_dotenv
+from app.core.context_packing import pack_search_results
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain_community.tools.tavily_search import TavilySearchResults
+from app.core.search_tool import get_search_tool
 
 load_dotenv()
 
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini", 
     temperature=0.1, 
     openai_api_key=OPENAI_API_KEY
 )
-tavily = TavilySearchResults(max_results=20)
+tavily = get_search_tool("info_perform", max_results=20)
 
 # 프롬프트 템플릿
 company_prompt = PromptTemplate.from_template(
@@ -39,8 +40,9 @@ async def get_info_perform(data: str):
     try:
         # 1. Tavily로 기업 실적 검색
         company_query = f"{company_name} 투자유치 매출 수상 실적"
-        company_search_result = tavily.invoke(company_query)
-        company_summary = company_chain.invoke({"text": company_search_result})
+        company_search_result = await tavily.ainvoke(company_query)
+        company_context = pack_search_results(company_search_result, company_query, "info_perform")
+        company_summary = await company_chain.ainvoke({"text": company_context})
 
         logging.info(f"Company Search Result: {company_summary}")
 
@@ -50,8 +52,9 @@ async def get_info_perform(data: str):
             ceo_name = ""
         # founder_query = f"{company_name} 창업자 {ceo_name}의 학력 경력 창업 이력"
         founder_query = f"{company_name} 창업자 {ceo_name} 경력 이력"
-        founder_search_result = tavily.invoke(founder_query)
-        founder_summary = founder_chain.invoke({"text": founder_search_result})
+        founder_search_result = await tavily.ainvoke(founder_query)
+        founder_context = pack_search_results(founder_search_result, founder_query, "info_perform")
+        founder_summary = await founder_chain.ainvoke({"text": founder_context})
 
         logging.info(f"Founder Search Result: {founder_summary}")
 
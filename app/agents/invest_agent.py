@@ -1,32 +1,90 @@
 import logging
 import os
+import threading
 from dotenv import load_dotenv
+from app.core.metrics import track_operation
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.runnables import RunnableLambda
+from app.core.vector_stores import get_vector_store
 
 load_dotenv()
 
-# 1. 임베딩 모델을 불러오고
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+# 1. 임베딩 모델은 업계 평균 벤치마크를 처음 계산할 때 불러옴 (모델 로딩이 수 초 이상 걸림)
+_embeddings = None
+_embeddings_lock = threading.Lock()
 
-# 2. 저장된 벡터 DB를 불러오기
-vector_db = Chroma(
-    persist_directory="./invest_db",  # 저장된 디렉토리
-    embedding_function=embeddings     # 같은 임베딩 모델로!
-)
+def get_embeddings():
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            _embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        return _embeddings
+
+# 2. 저장된 벡터 DB 경로 (실행 위치와 무관하도록 모듈 기준 경로 사용)
+INVEST_DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invest_db")
 
 def get_industry_baseline(query: str, k=1):
-    results = vector_db.similarity_search(query, k=k)
+    # 같은 임베딩 모델로 연 벡터 DB 핸들을 프로세스 전체에서 재사용
+    vector_db = get_vector_store(INVEST_DB_DIR, get_embeddings)
+    with track_operation("vector_search"):
+        results = vector_db.similarity_search(query, k=k)
     return "\n".join([r.page_content for r in results])
 
+# 투자 판단에 사용하는 업계 평균 벤치마크 검색어
+BASELINE_QUERY = "2025년 AI 스타트업 업계 평균 Revenue Multiple"
+
+
+class IndustryBaselineProvider:
+    """
+    업계 평균 벤치마크 검색 결과를 (검색어, 산업분야) 단위로 메모리에 보관
+
+    invest_db 파일이 바뀐 경우에만 다시 검색하므로, 평소에는 임베딩 모델을 호출하지 않음
+    """
+
+    def __init__(self, db_dir: str):
+        self.db_dir = db_dir
+        self._cache = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _store_version(self):
+        # Chroma는 chroma.sqlite3와 세그먼트 디렉토리에 기록하므로 둘의 수정 시각을 함께 확인
+        paths = [self.db_dir, os.path.join(self.db_dir, "chroma.sqlite3")]
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+    def get(self, query: str = BASELINE_QUERY, industry: str = None, k: int = 1) -> str:
+        with self._lock:
+            version = self._store_version()
+            if version != self._version:
+                if self._cache:
+                    logging.info("invest_db 변경 감지, 업계 평균 벤치마크 다시 계산")
+                self._cache.clear()
+                self._version = version
+
+            key = (query, industry, k)
+            if key not in self._cache:
+                search_query = f"{query} {industry}" if industry else query
+                self._cache[key] = get_industry_baseline(search_query, k=k)
+                # 처음 여는 경우 Chroma가 파일을 갱신할 수 있으므로 조회 후 시각을 다시 기록
+                self._version = self._store_version()
+            return self._cache[key]
+
+    def warm_up(self, queries=(BASELINE_QUERY,)):
+        """서버 시작 시 자주 쓰는 벤치마크를 미리 계산"""
+        for query in queries:
+            self.get(query)
+
+
+baseline_provider = IndustryBaselineProvider(INVEST_DB_DIR)
+
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini", 
     temperature=0.1, 
     openai_api_key=OPENAI_API_KEY
@@ -62,7 +120,7 @@ output_parser = StrOutputParser()
 
 chain = (
     RunnableLambda(lambda x: {
-        "baseline": get_industry_baseline("2025년 AI 스타트업 업계 평균 Revenue Multiple"),
+        "baseline": baseline_provider.get(BASELINE_QUERY),
         "text": x["text"]
     }) 
     | prompt
@@ -92,7 +150,7 @@ async def get_invest_judgement(data: list[dict]):
 
         logging.info(f"Received data: {data}")
 
-        invest_judge = chain.invoke({"text": data})
+        invest_judge = await chain.ainvoke({"text": data})
 
         logging.info(f"Judge Result: {invest_judge}")
 
@@ -1,12 +1,14 @@
+import asyncio
 import logging
 import os
 import re
 from dotenv import load_dotenv
+from app.core.context_packing import merge_search_results, pack_search_results
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain_community.tools.tavily_search import TavilySearchResults
+from app.core.search_tool import get_search_tool
 
 # 환경 변수 로드
 load_dotenv()
@@ -14,13 +16,23 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.1,
     openai_api_key=OPENAI_API_KEY
 )
 
-tavily = TavilySearchResults(max_results=20)
+tavily = get_search_tool("market", max_results=20)
+
+# 시장성 분석에 필요한 하위 검색어 ({company_name}, {industry} 치환) - 모두 동시에 검색한 뒤 한 번에 분석
+MARKET_QUERIES = [
+    # 시장 규모, 성장성, 트렌드
+    "{company_name} {industry} 시장 규모 TAM SAM SOM 성장률 트렌드 전망",
+    # 고객 세그먼트, 진입 장벽, 경쟁, 규제
+    "{company_name} {industry} 고객 세그먼트 시장 진입장벽 경쟁 규제",
+    # 수익 모델, 고객 획득 비용, 판매 채널 (분석 항목 4)
+    "{company_name} {industry} 수익 모델 고객 획득 비용 CAC LTV 판매 채널",
+]
 
 # 프롬프트 템플릿
 market_analysis_prompt = PromptTemplate.from_template(
@@ -76,24 +88,18 @@ async def assess_market_potential(data: str):
     company_name, industry = extract_company_info(data)
     
     try:
-        # 통합된 시장성 분석 쿼리 (규모, 성장성, 트렌드 포함)
-        market_query = f"{company_name} {industry} 시장 규모 TAM SAM SOM 성장률 트렌드 전망"
-        market_search_result = tavily.invoke(market_query)
-        market_analysis = market_analysis_chain.invoke({
-            "company_name": company_name,
-            "text": market_search_result
-        })
-        logging.info(f"Market Analysis Result: {market_analysis}")
-        
-        # 추가 정보 검색 (고객 세그먼트, 진입 장벽)
-        additional_query = f"{company_name} {industry} 고객 세그먼트 시장 진입장벽 경쟁 규제"
-        additional_search_result = tavily.invoke(additional_query)
-        
-        # 검색 결과 합치기 및 분석 확장
-        combined_search_results = market_search_result + additional_search_result
-        comprehensive_analysis = market_analysis_chain.invoke({
+        # 하위 검색어를 동시에 검색
+        queries = [q.format(company_name=company_name, industry=industry) for q in MARKET_QUERIES]
+        search_results = await asyncio.gather(*(tavily.ainvoke(q) for q in queries))
+
+        # 검색 결과 합치기 (URL 중복 제거 후 예산 안에서 관련도 높은 자료 우선)
+        combined_search_results = merge_search_results(search_results)
+        combined_context = pack_search_results(combined_search_results, " ".join(queries), "market")
+
+        # 합친 자료로 한 번만 분석
+        comprehensive_analysis = await market_analysis_chain.ainvoke({
             "company_name": company_name,
-            "text": combined_search_results
+            "text": combined_context
         })
         
         logging.info(f"Comprehensive Market Analysis Result: {comprehensive_analysis}")
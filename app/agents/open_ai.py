@@ -2,7 +2,7 @@ import logging
 import os
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from app.core.chat_models import RateLimitedChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 
@@ -10,11 +10,12 @@ load_dotenv()
 
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 
-model = ChatOpenAI(
+model = RateLimitedChatOpenAI(
     model="gpt-4o-mini", 
     temperature=0.5, 
     openai_api_key=OPENAI_API_KEY, 
-    streaming=True
+    streaming=True,
+    cache=False
 )
 
 templete='{text}'
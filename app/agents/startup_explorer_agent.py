@@ -2,25 +2,34 @@ from app.agents.competitor_compare_agent import compare_competitors
 from app.agents.info_perform_agent import get_info_perform
 from app.agents.market_agent import assess_market_potential
 from app.agents.vectorize_papers_agent import get_tech_summary
-from langchain_community.tools.tavily_search import TavilySearchResults
+from app.core.search_tool import get_search_tool
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from typing import List, Dict, Any
+from app.core.chat_models import RateLimitedChatOpenAI
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor
 from langchain.agents import create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
+import asyncio
 import os
 import random
-from app.agents.generate_report_agent import create_final_report
+from app.agents.generate_report_agent import create_final_report, stream_final_report
 from app.agents.invest_agent import get_invest_judgement
 import logging
+from app.core.context_packing import pack_search_results
+from app.core.evidence_store import create_evidence_store, use_evidence_store
+from app.core.metrics import track_agent
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 CHAT_MODEL = "gpt-4o-mini"
+# supervisor에서 동시에 실행할 분석 에이전트 최대 개수
+SUPERVISOR_MAX_CONCURRENCY = int(os.getenv("SUPERVISOR_MAX_CONCURRENCY", "4"))
+
+# supervisor 파이프라인 단계 (진행 상황 콜백에서 사용하는 이름)
+PIPELINE_STAGES = ["explorer", "info_perform", "competitor", "market", "tech", "invest", "report"]
 
 
 class StartupExplorerAgent:
@@ -33,19 +42,27 @@ class StartupExplorerAgent:
     3. 정형화된 형식으로 스타트업 정보 제공
     """
 
-    def __init__(self):
+    def __init__(self, startup_name: str = "", found_startups: Optional[List[str]] = None):
         """
         에이전트 초기화
+
+        Args:
+            startup_name: 지정하면 검색/선정 단계를 건너뛰고 해당 회사를 분석
+            found_startups: 이미 선정한 회사 목록 (여러 에이전트가 공유하면 중복 선정을 피할 수 있음)
         """
         self.startup_data = ""
         self.selected_startups = []
-        self.search_tool = TavilySearchResults(max_results=20, api_key=TAVILY_API_KEY)
-        self.llm = ChatOpenAI(model=CHAT_MODEL)
+        self.search_tool = get_search_tool("explorer", max_results=20)
+        # 탐색 단계는 매번 다른 회사를 선정해야 하므로 LLM 캐시를 사용하지 않음
+        self.llm = RateLimitedChatOpenAI(model=CHAT_MODEL, cache=False)
         self.search_results = []
-        self.startup_name = ""
-        self.found_startups = []
+        self.search_query = ""
+        self.startup_name = startup_name
+        self.found_startups = found_startups if found_startups is not None else []
+        self.on_stage = None
+        self.on_report_token = None
 
-    def search_startups(self) -> List[Dict[str, Any]]:
+    async def search_startups(self) -> List[Dict[str, Any]]:
         """
         스타트업 검색을 수행
 
@@ -54,11 +71,12 @@ class StartupExplorerAgent:
         """
         # 검색 쿼리 조정
         search_query = self._generate_rich_startup_query()
+        self.search_query = search_query
 
         print(f"검색 쿼리: {search_query}")
 
         # 실제 검색 수행
-        self.search_results = self._perform_web_search(search_query)
+        self.search_results = await self._perform_web_search(search_query)
 
         return self.search_results
 
@@ -102,12 +120,12 @@ class StartupExplorerAgent:
 
         return query
 
-    def _perform_web_search(self, query: str) -> List[Dict[str, Any]]:
+    async def _perform_web_search(self, query: str) -> List[Dict[str, Any]]:
         """
         LangChain TavilySearchResults 도구를 이용한 검색 결과 반환
         """
         try:
-            self.search_results = self.search_tool.invoke(query)
+            self.search_results = await self.search_tool.ainvoke(query)
 
             return self.search_results
 
@@ -115,7 +133,7 @@ class StartupExplorerAgent:
             print(f"Tavily 검색 도구 실행 중 오류 발생: {str(e)}")
             return []
 
-    def select_startup_from_search_results(self) -> str:
+    async def select_startup_from_search_results(self) -> str:
         tools = [self.search_tool]
         # 1. 프롬프트 템플릿 설정
         prompt_template = PromptTemplate.from_template(
@@ -142,13 +160,16 @@ class StartupExplorerAgent:
         chain = prompt_template | self.llm | StrOutputParser()
 
         # 4. 질문에 대한 답변 생성
-        response = chain.invoke(
-            {"context": self.search_results, "list": self.found_startups}
+        response = await chain.ainvoke(
+            {
+                "context": pack_search_results(self.search_results, self.search_query, "explorer"),
+                "list": self.found_startups,
+            }
         )
 
         return response.strip()
 
-    def collect_detailed_info(self) -> str:
+    async def collect_detailed_info(self) -> str:
         """
         회사명을 기반으로 Tavily 검색 후, LLM으로 요약된 회사 정보 반환
 
@@ -158,7 +179,7 @@ class StartupExplorerAgent:
         try:
             # 1. Tavily 검색
             query = f"{self.startup_name} 회사 및 대표자 정보, 설립연도, 주요 AI 기술, 투자 현황, 최근 뉴스"
-            search_result = self.search_tool.invoke(query)
+            search_result = await self.search_tool.ainvoke(query)
             tools = [self.search_tool]
 
             # 2. 프롬프트 정의
@@ -205,10 +226,10 @@ class StartupExplorerAgent:
 
             inputs = {
                 "company": self.startup_name,
-                "context": search_result,
+                "context": pack_search_results(search_result, query, "explorer"),
                 "tools": tools,
             }
-            summary = agent_executor.invoke(inputs)
+            summary = await agent_executor.ainvoke(inputs)
 
             print(f"기업정보: {summary['output'].strip()}")
 
@@ -217,68 +238,210 @@ class StartupExplorerAgent:
         except Exception as e:
             return f"[오류 발생] {str(e)}"
 
-    async def run_exploration_pipeline(self) -> List[str]:
+    async def discover_startup(self) -> str:
         """
-        스타트업 탐색 전체 파이프라인 실행
+        스타트업 검색 후 분석할 회사 1곳을 선정
 
         Returns:
-            포맷팅된 스타트업 정보
+            선정된 회사명
         """
-        print(f"=== 스타트업 탐색 시작 ===")
-
         # 1. 스타트업 검색
         print("1. 스타트업 검색 중...")
-        self.search_startups()
+        await self.search_startups()
         print(f"자료 검색 완료")
 
         # 2. 검색된 정보를 바탕으로 회사 선정
         print("2. 회사 선정 중...")
-        self.startup_name = self.select_startup_from_search_results()
-        self.found_startups.append(self.startup_name)
+        self.startup_name = await self.select_startup_from_search_results()
+        # 여러 에이전트가 목록을 공유하므로 이미 있는 회사는 다시 추가하지 않음
+        if self.startup_name and self.startup_name not in self.found_startups:
+            self.found_startups.append(self.startup_name)
         print(f"회사 이름: {self.startup_name}")
 
+        return self.startup_name
+
+    async def run_exploration_pipeline(self) -> List[str]:
+        """
+        스타트업 탐색 전체 파이프라인 실행
+
+        Returns:
+            포맷팅된 스타트업 정보
+        """
+        print(f"=== 스타트업 탐색 시작 ===")
+
+        if self.startup_name:
+            print(f"지정된 회사: {self.startup_name}")
+        else:
+            await self.discover_startup()
+
         # 3. 회사 상세 정보 수집
         print("3. 회사 상세 정보 수집 중...")
-        self.startup_data = self.collect_detailed_info()
+        self.startup_data = await self.collect_detailed_info()
         print(f"{self.startup_name}의 상세정보 검색 완료")
 
         print("=== 스타트업 탐색 완료 ===")
 
         return self.startup_data
 
-    async def supervisor(self):
-      await self.run_exploration_pipeline()
-      
-      exploration_result = {
-            "기업 정보 요약": self.startup_data 
+    def _notify(self, stage: str, status: str, result: Any = None):
+        """단계별 진행 상황을 on_stage 콜백으로 전달"""
+        if self.on_stage is not None:
+            self.on_stage(stage, status, result)
+
+    async def _run_stage(self, stage: str, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        self._notify(stage, "running")
+        try:
+            with track_agent(stage):
+                result = await func(*args)
+        except Exception:
+            self._notify(stage, "failed")
+            raise
+        self._notify(stage, "completed", result)
+        return result
+
+    async def _explore(self) -> Dict[str, Any]:
+        await self.run_exploration_pipeline()
+        return {
+            "기업 정보 요약": self.startup_data
         }
-      
-      # 기술 요약 반환
-      tech_info = await get_tech_summary(self.startup_data)      
-      
-      # 창업자 정보 실적 반환
-      perform_info = await get_info_perform(self.startup_data)
-      
-      # 경쟁사 비교 분석 반환
-      competiter_info = await compare_competitors(self.startup_data)
-      
-      # 시장 비교 분석 반환
-      market_info = await assess_market_potential(self.startup_data)
-
-      logging.info(tech_info)
-
-      data = [
-          exploration_result,
-          perform_info,
-          competiter_info,
-          market_info,
-          tech_info
-          ]
-      
-      invest_info = await get_invest_judgement(data)
-      print("=== 투자 판단 완료 ===")
-      data.append(invest_info)
-
-      final_report = await create_final_report(data)
-      
-      return exploration_result, perform_info, competiter_info, market_info, invest_info, final_report
+
+    async def _create_report(self, data: List[Dict[str, Any]]) -> str:
+        """on_report_token이 설정되어 있으면 보고서를 토큰 단위로 전달하면서 전체 텍스트를 조립"""
+        if self.on_report_token is None:
+            return await create_final_report(data)
+
+        tokens = []
+        async for token in stream_final_report(data):
+            tokens.append(token)
+            self.on_report_token(token)
+        return "".join(tokens)
+
+    async def _run_analysis_agents(self, concurrent: bool, max_concurrency: int) -> List[Dict[str, Any]]:
+        """
+        startup_data만을 입력으로 받는 분석 에이전트들을 실행
+
+        Args:
+            concurrent: True이면 동시에 실행, False이면 순차 실행
+            max_concurrency: 동시에 실행할 최대 에이전트 수
+
+        Returns:
+            [실적/창업자, 경쟁사, 시장성, 기술 요약] 순서의 결과 리스트
+        """
+        # 결과 순서는 get_invest_judgement / create_final_report가 기대하는 순서와 동일해야 함
+        agents = [
+            ("info_perform", get_info_perform),
+            ("competitor", compare_competitors),
+            ("market", assess_market_potential),
+            ("tech", get_tech_summary),
+        ]
+
+        if not concurrent:
+            return [await self._run_stage(stage, agent, self.startup_data) for stage, agent in agents]
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_with_limit(stage, agent):
+            async with semaphore:
+                return await self._run_stage(stage, agent, self.startup_data)
+
+        # gather는 입력 순서대로 결과를 반환하므로 완료 순서와 무관하게 순서가 유지됨
+        return list(await asyncio.gather(*(run_with_limit(stage, agent) for stage, agent in agents)))
+
+    async def supervisor(
+        self,
+        concurrent: bool = True,
+        max_concurrency: Optional[int] = None,
+        on_stage: Optional[Callable[[str, str, Any], None]] = None,
+        on_report_token: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        탐색 → 분석 에이전트(실적/경쟁사/시장성/기술) → 투자 판단 → 보고서 생성 파이프라인 실행
+
+        Args:
+            concurrent: 분석 에이전트들을 동시에 실행할지 여부
+            max_concurrency: 동시에 실행할 최대 에이전트 수 (기본값: SUPERVISOR_MAX_CONCURRENCY)
+            on_stage: 단계 상태가 바뀔 때마다 (단계명, "running"/"completed"/"failed", 결과)로 호출되는 콜백
+                      단계명은 PIPELINE_STAGES 참고
+            on_report_token: 지정하면 최종 보고서를 스트리밍으로 생성하며 토큰마다 호출되는 콜백
+
+        실행 중 모든 에이전트의 웹 검색 결과는 하나의 근거 저장소에 모이며,
+        이미 모인 자료로 답할 수 있는 검색은 웹 검색 없이 저장소에서 처리됨
+        """
+        self.on_stage = on_stage
+        self.on_report_token = on_report_token
+
+        with use_evidence_store(create_evidence_store()):
+            return await self._run_pipeline(concurrent, max_concurrency)
+
+    async def _run_pipeline(self, concurrent: bool, max_concurrency: Optional[int]):
+        exploration_result = await self._run_stage("explorer", self._explore)
+
+        if max_concurrency is None:
+            max_concurrency = SUPERVISOR_MAX_CONCURRENCY
+
+        perform_info, competiter_info, market_info, tech_info = await self._run_analysis_agents(
+            concurrent, max_concurrency
+        )
+
+        logging.info(tech_info)
+
+        data = [
+            exploration_result,
+            perform_info,
+            competiter_info,
+            market_info,
+            tech_info
+        ]
+
+        invest_info = await self._run_stage("invest", get_invest_judgement, data)
+        print("=== 투자 판단 완료 ===")
+        data.append(invest_info)
+
+        final_report = await self._run_stage("report", self._create_report, data)
+
+        return exploration_result, perform_info, competiter_info, market_info, invest_info, final_report
+
+    async def stream_supervisor(
+        self,
+        concurrent: bool = True,
+        max_concurrency: Optional[int] = None,
+        stream_report: bool = True,
+    ):
+        """
+        supervisor를 실행하면서 각 단계가 끝나는 즉시 (단계명, 결과)를 yield
+
+        stream_report가 True이면 최종 보고서 생성 중 ("report_token", 토큰)도 yield
+
+        마지막으로 ("final", supervisor 반환 튜플)을 yield하며,
+        호출 측이 중간에 순회를 멈추면(클라이언트 연결 종료 등) 파이프라인도 취소됨
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_stage(stage, status, result):
+            if status == "completed":
+                queue.put_nowait((stage, result))
+
+        def on_report_token(token):
+            queue.put_nowait(("report_token", token))
+
+        task = asyncio.create_task(
+            self.supervisor(
+                concurrent=concurrent,
+                max_concurrency=max_concurrency,
+                on_stage=on_stage,
+                on_report_token=on_report_token if stream_report else None,
+            )
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            # 파이프라인이 실패한 경우 여기서 예외가 다시 발생함
+            yield "final", task.result()
+        finally:
+            if not task.done():
+                task.cancel()
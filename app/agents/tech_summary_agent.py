@@ -1,16 +1,23 @@
 import os
-import requests
 import logging
-import xml.etree.ElementTree as ET
-from openai import OpenAI
-from langchain_chroma import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
+import time
+from openai import AsyncOpenAI
+from app.core.embeddings import get_openai_embeddings
+from app.core.kipris import get_patents
+from app.core.vector_stores import get_vector_store
 from dotenv import load_dotenv
+from app.core.context_packing import count_tokens, get_context_budget, pack_context, select_snippets
+from app.core.chat_models import estimate_chat_tokens
+from app.core.hybrid_search import hybrid_search
+from app.core.metrics import record_llm_call
+from app.core.rate_limit import call_with_retry, get_limiter
+from app.core.workers import run_sync
 
 
 # 환경 변수 로드
 load_dotenv()
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 재시도는 call_with_retry 한 곳에서만 수행 (SDK 자체 재시도는 끔)
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 
 logging.basicConfig(
     level=logging.INFO,  # INFO 이상의 로그만 출력
@@ -18,44 +25,44 @@ logging.basicConfig(
 )
 
 
-# 회사 특허 전체 가져오기
-def fetch_patents(applicant_name):
+# 회사 특허 전체 가져오기 (모든 페이지, 출원인별 디스크 캐시 및 증분 갱신)
+async def fetch_patents(applicant_name):
     logging.info(f"특허 검색: {applicant_name}")
+    try:
+        return await get_patents(applicant_name)
+    except Exception as e:
+        # API 키 오류, 호출 한도 초과 등으로 조회할 수 없으면 특허 없음으로 처리 (파이프라인은 계속 진행)
+        logging.warning(f"특허 조회 실패: {applicant_name} ({e})")
+        return []
 
-    url = "http://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getAdvancedSearch"
-    params = {
-        "ServiceKey": os.getenv("KIPRIS_API_KEY"),
-        "applicant": applicant_name,
-        "pageNo": 1,
-        "numOfRows": 100,
-        "sortSpec": "PD",
-        "descSort": False,
-    }
-    response = requests.get(url, params=params)
-    root = ET.fromstring(response.text)
-
-    patents = []
-    for item in root.findall(".//item"):
-        patent = {
-            "출원인": item.findtext("applicantName", default=""),
-            "출원일자": item.findtext("applicationDate", default=""),
-            "출원번호": item.findtext("applicationNumber", default=""),
-            "초록": item.findtext("astrtCont", default=""),
-            "발명의명칭": item.findtext("inventionTitle", default=""),
-            "IPC번호": item.findtext("ipcNumber", default=""),
-            "공개일자": item.findtext("openDate", default=""),
-            "공개번호": item.findtext("openNumber", default=""),
-            "등록상태": item.findtext("registerStatus", default=""),
-        }
-        patents.append(patent)
-    return patents
+
+async def create_chat_completion(**kwargs):
+    """OpenAI 채팅 API 호출 (요청 한도/재시도 적용, 모델별 시간과 토큰 수 기록)"""
+    start = time.perf_counter()
+    estimated = estimate_chat_tokens(kwargs["messages"], kwargs.get("max_tokens"))
+    response = await call_with_retry("openai", openai_client.chat.completions.create, tokens=estimated, **kwargs)
+    usage = response.usage
+    get_limiter("openai").record_tokens(estimated, usage.total_tokens if usage else None)
+    record_llm_call(
+        response.model or kwargs["model"],
+        time.perf_counter() - start,
+        usage.prompt_tokens if usage else 0,
+        usage.completion_tokens if usage else 0,
+    )
+    return response
+
+
+def patent_snippets(patents):
+    """특허 목록을 컨텍스트 압축용 자료 목록으로 변환"""
+    return [{"source": "", "text": f"제목: {p['발명의명칭']}\n초록: {p['초록']}"} for p in patents]
 
 
 # 통합 키워드 추출
-def extract_keywords_from_patents(patents, top_n=5):
-    combined_text = ""
-    for p in patents:
-        combined_text += f"제목: {p['발명의명칭']}\n초록: {p['초록']}\n\n"
+async def extract_keywords_from_patents(patents, top_n=5):
+    # 특허가 많아도 예산 안에서 중복 초록을 제외하고 최신(수집 순서) 특허부터 포함
+    combined_text = pack_context(
+        patent_snippets(patents), query="", budget=get_context_budget("tech_keywords")
+    )
 
     prompt = f"""
 다음은 한 회사의 전체 특허 목록입니다. 이 특허들의 기술 내용을 바탕으로 핵심 기술 키워드 {top_n}개를 뽑아 주세요.
@@ -65,7 +72,7 @@ def extract_keywords_from_patents(patents, top_n=5):
 """
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await create_chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
@@ -81,39 +88,20 @@ def extract_keywords_from_patents(patents, top_n=5):
         return []
 
 
-# 통합 키워드로 논문 검색
-def search_docs_by_combined_keywords(keywords, db_path, top_k=5):
-    vectorstore = Chroma(
-        persist_directory=db_path, embedding_function=OpenAIEmbeddings()
-    )
-    retriever = vectorstore.as_retriever(
-        search_type="similarity", search_kwargs={"k": top_k}
-    )
-
-    combined_query = " ".join(keywords)
+# 키워드별 BM25 + 벡터 하이브리드 검색으로 논문 검색
+async def search_docs_by_keywords(keywords, db_path, top_k=5):
+    # 프로세스에서 처음 여는 경우에만 Chroma 로딩(동기 I/O)이 발생하므로 워커 풀에서 실행
+    vectorstore = await run_sync(get_vector_store, db_path, get_openai_embeddings)
     try:
-        docs = retriever.invoke(combined_query)
-        return docs
+        # 키워드를 한 문장으로 합치면 한/영 기술 용어가 서로 희석되므로 키워드마다 검색 후 RRF로 합침
+        return await hybrid_search(vectorstore, keywords, top_k=top_k)
     except Exception as e:
         logging.info(f"논문 검색 실패: {e}")
         return []
 
 
-# 특허 리스트 변환 함수
-def convert_kipris_patents_to_llm_ready(patents):
-    converted = []
-    for p in patents:
-        title = p.get("발명의명칭", "").strip()
-        summary = p.get("초록", "").strip()
-        if title and summary:
-            converted.append({"title": title, "summary": summary})
-    return converted
-
-
-def tech_summary(company_name, db_path):
-    patents = fetch_patents(company_name)
-    # 변환 적용
-    converted_patents = convert_kipris_patents_to_llm_ready(patents)
+async def tech_summary(company_name, db_path):
+    patents = await fetch_patents(company_name)
 
     if not patents:
         logging.info("특허 없음. 회사명을 다시 확인하세요.")
@@ -126,15 +114,10 @@ def tech_summary(company_name, db_path):
     logging.info(f"총 {len(patents)}건의 특허 수집됨")
 
     # 키워드 추출
-    keywords = extract_keywords_from_patents(patents, top_n=5)
-
-    # 초록 통합
-    abstract_text = "\n".join(
-        [f"- {p['발명의명칭']}:\n{p['초록']}" for p in patents if p["초록"]]
-    )
+    keywords = await extract_keywords_from_patents(patents, top_n=5)
 
     # 논문 검색
-    docs = search_docs_by_combined_keywords(keywords, db_path=db_path, top_k=5)
+    docs = await search_docs_by_keywords(keywords, db_path=db_path, top_k=5)
     logging.info(f"관련 논문 검색 결과: {len(docs)}건")
 
     summaries = []
@@ -144,10 +127,14 @@ def tech_summary(company_name, db_path):
 
     # LLM 프롬프트 구성
     joined_summaries = "\n".join(summaries)
-    # 특허 텍스트 생성
-    joined_patents = "\n".join(
-        [f"- 특허명: {p['title']}\n  내용: {p['summary']}" for p in converted_patents]
-    )
+
+    # 초록 통합: 논문 요약을 뺀 남은 예산 안에서 키워드와 관련도 높은 특허부터 한 번만 포함
+    patents_with_abstract = [p for p in patents if p["초록"]]
+    patent_budget = get_context_budget("tech") - count_tokens(joined_summaries)
+    selected = select_snippets(patent_snippets(patents_with_abstract), " ".join(keywords), patent_budget)
+    abstract_text = "\n\n".join(block for _, block in selected)
+    # 하단 특허 목록은 본문에 포함된 특허의 이름만 나열 (초록을 두 번 넣지 않음)
+    joined_patents = "\n".join(f"- 특허명: {patents_with_abstract[i]['발명의명칭']}" for i, _ in selected)
 
     prompt = f"""
     당신은 기술 스타트업에 투자할지 판단해야 하는 전문가가입니다.
@@ -178,7 +165,7 @@ def tech_summary(company_name, db_path):
     출력 요건:
     - 전체 기술을 대표할 수 있도록 최대한 상세하고 객관적으로 작성
     - bullet 없이 하나의 논리적 단락으로 구성 (20문장 이상)
-    - **보고서 하단에 아래 특허 목록을 특허명과 내용을 통해 보여줄 것 단, 내용은 특허 설명과 함께 장단점을 포함하여 한,두문장을 사용해서 요약** (요약 결과 이후 구분선으로 삽입)
+    - **보고서 하단에 아래 특허 목록을 특허명과 내용을 통해 보여줄 것 단, 내용은 위 특허 초록을 참고해 특허 설명과 함께 장단점을 포함하여 한,두문장을 사용해서 요약** (요약 결과 이후 구분선으로 삽입)
 
     요약 결과 아래에 다음과 같은 특허 목록을 포함하세요:
 
@@ -186,7 +173,7 @@ def tech_summary(company_name, db_path):
     """
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await create_chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
@@ -1,20 +1,18 @@
 import os
-import requests
 import logging
 import asyncio
 import re
+import json
+import time
 import xml.etree.ElementTree as ET
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from langchain.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain.schema import Document
-from langchain_community.chat_models import ChatOpenAI
-from PyPDF2 import PdfReader
+from app.core.embeddings import get_openai_embeddings
+from app.core.vector_stores import get_vector_store
+from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.agents.tech_summary_agent import tech_summary
+from app.core.http_client import default_timeout, get_async_client
+from app.core.rate_limit import call_with_retry
+from app.core.workers import run_sync
 
 from dotenv import load_dotenv
 
@@ -27,49 +25,167 @@ logging.basicConfig(
 )
 
 
-# arXiv API를 통해 논문 메타데이터 가져오기
-def fetch_arxiv_papers(query, max_results=300):
-    base_url = "http://export.arxiv.org/api/query?"
+# arXiv 응답 대기 타임아웃 (초, 연결 타임아웃 등은 공통 HTTP 설정을 따름)
+ARXIV_TIMEOUT = float(os.getenv("ARXIV_TIMEOUT", "60"))
+
+ARXIV_QUERY = 'cat:cs.AI OR cat:stat.ML OR all:"artificial intelligence" OR all:"deep learning"'
+# 처음 벡터 DB를 만들 때 가져올 최신 논문 수 (최대)
+ARXIV_FETCH_SIZE = int(os.getenv("ARXIV_FETCH_SIZE", "300"))
+# 증분 수집은 마지막으로 색인한 논문까지 페이지를 넘기며 가져오되, 한 번에 이 수를 넘지 않음
+ARXIV_INCREMENTAL_MAX_FETCH = int(os.getenv("ARXIV_INCREMENTAL_MAX_FETCH", "5000"))
+# arXiv API 한 페이지(요청 1회)당 논문 수
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+# 기존 벡터 DB가 있을 때 새 논문 확인 주기 (초)
+ARXIV_REFRESH_INTERVAL = int(os.getenv("ARXIV_REFRESH_INTERVAL", str(6 * 3600)))
+
+# 1이면 새로 수집한 논문 목록을 PDF로도 저장 (벡터 DB 구축에는 사용하지 않음)
+ARXIV_EXPORT_PDF = os.getenv("ARXIV_EXPORT_PDF", "0") == "1"
+# 한 번에 분할/색인할 논문 수
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+
+OUTPUT_DIR = "output"
+PAPERS_DB_DIR = os.path.join(OUTPUT_DIR, "vector_db")
+INGEST_STATE_FILE = "ingest_state.json"
+
+_ingest_lock = asyncio.Lock()
+_background_tasks = set()
+
+
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+# arXiv Atom entry 요소 → 논문 메타데이터
+def parse_arxiv_entry(entry):
+    title = entry.findtext(f"{ATOM_NS}title", default="").strip()
+    summary = entry.findtext(f"{ATOM_NS}summary", default="").strip()
+    published = entry.findtext(f"{ATOM_NS}published", default="").strip()
+    # http://arxiv.org/abs/2401.01234v1 → 2401.01234
+    arxiv_id = entry.findtext(f"{ATOM_NS}id", default="").strip().rsplit("/abs/", 1)[-1]
+    arxiv_id = re.sub(r"v\d+$", "", arxiv_id)
+    authors = [name.text.strip() for name in entry.iterfind(f"{ATOM_NS}author/{ATOM_NS}name") if name.text]
+
+    return {
+        "title": title,
+        "summary": summary,
+        "authors": ", ".join(authors),
+        "published": published[:10],  # YYYY-MM-DD 형태로 추출
+        "published_at": published,  # 증분 수집 비교용 전체 타임스탬프
+        "arxiv_id": arxiv_id,
+    }
+
+
+class ArxivFeedParser:
+    """
+    arXiv Atom 응답을 받는 대로 조금씩 파싱하는 증분 파서
+
+    feed()로 받은 바이트를 넣으면 완성된 entry만 논문 dict로 돌려주고,
+    처리한 요소는 바로 비워서 응답 전체를 트리로 들고 있지 않음
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+        # opensearch:totalResults (검색 결과 전체 건수)
+        self.total = None
+
+    def _read_events(self):
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag == f"{ATOM_NS}entry":
+                yield parse_arxiv_entry(element)
+                # 처리한 entry는 루트에서 떼어내 메모리에 쌓이지 않도록 함
+                self._root.remove(element)
+            elif element.tag == f"{OPENSEARCH_NS}totalResults" and element.text:
+                self.total = int(element.text)
+
+    def feed(self, data: bytes):
+        self._parser.feed(data)
+        yield from self._read_events()
+
+    def close(self):
+        self._parser.close()
+        yield from self._read_events()
+
+
+# arXiv API 한 페이지(start부터 page_size건)를 스트리밍으로 받아 파싱
+async def fetch_arxiv_page(query, start, page_size):
+    """
+    Returns:
+        (논문 목록, 검색 결과 전체 건수)
+
+    응답 본문은 받는 대로 증분 파서에 넣으므로 메모리에는 이 페이지의 논문 dict만 남음.
+    요청 간격은 "arxiv" 업스트림 한도(기본 3초에 1회)로 조절됨
+    """
     params = {
         "search_query": query,
-        "start": 0,
-        "max_results": max_results,
+        "start": start,
+        "max_results": page_size,
         "sortBy": "submittedDate",
         "sortOrder": "descending",
     }
-    response = requests.get(base_url, params=params)
-    response.raise_for_status()
-    return response.text
-
-
-# arXiv API 응답 파싱
-def parse_arxiv_response(xml_data):
-    root = ET.fromstring(xml_data)
-    ns = {"arxiv": "http://www.w3.org/2005/Atom"}
-    entries = []
-
-    for entry in root.findall("arxiv:entry", ns):
-        title = entry.find("arxiv:title", ns).text.strip()
-        summary = entry.find("arxiv:summary", ns).text.strip()
-        published = entry.find("arxiv:published", ns).text.strip()
-        authors = []
-        for author in entry.findall("arxiv:author/arxiv:name", ns):
-            authors.append(author.text.strip())
-
-        entries.append(
-            {
-                "title": title,
-                "summary": summary,
-                "authors": ", ".join(authors),
-                "published": published[:10],  # YYYY-MM-DD 형태로 추출
-            }
-        )
 
-    return entries
+    client = get_async_client()
+
+    async def request():
+        parser = ArxivFeedParser()
+        papers = []
+        async with client.stream("GET", ARXIV_API_URL, params=params, timeout=default_timeout(ARXIV_TIMEOUT)) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                papers.extend(parser.feed(chunk))
+        papers.extend(parser.close())
+        return papers, parser.total
+
+    return await call_with_retry("arxiv", request)
+
+
+async def harvest_arxiv_papers(query, max_results=ARXIV_FETCH_SIZE, page_size=ARXIV_PAGE_SIZE, since=""):
+    """
+    최신순으로 arXiv 논문을 페이지 단위로 가져와 한 편씩 내보내는 비동기 제너레이터
+
+    - start 오프셋을 page_size씩 늘려 가며 max_results건까지 요청
+    - 결과가 끝났거나(짧은 페이지), since(published 시각)보다 오래된 논문이 나오면 중단
+    - since까지 도달하기 전에 max_results에 걸리면 그 사이 논문은 수집되지 않으므로 경고를 남김
+    - 한 번에 한 페이지만 메모리에 두므로 수집 건수와 관계없이 메모리 사용량이 일정함
+    - 수집 중 새 논문이 등록되면 오프셋이 밀려 같은 논문이 다음 페이지에 다시 나오므로 arxiv_id로 중복 제거
+    """
+    seen_ids = set()
+    start = 0
+    while start < max_results:
+        size = min(page_size, max_results - start)
+        papers, total = await fetch_arxiv_page(query, start, size)
+        for paper in papers:
+            if since and paper["published_at"] < since:
+                return
+            if paper["arxiv_id"] in seen_ids:
+                continue
+            seen_ids.add(paper["arxiv_id"])
+            yield paper
+
+        start += len(papers)
+        if len(papers) < size or (total is not None and start >= total):
+            return
+
+    if since:
+        logging.warning(
+            f"arXiv 증분 수집이 최대 {max_results}건에서 중단되어 {since} 이후 논문 중 일부를 건너뜁니다 "
+            f"(ARXIV_INCREMENTAL_MAX_FETCH를 늘리거나 ARXIV_REFRESH_INTERVAL을 줄이세요)"
+        )
 
 
 # 논문 정보를 PDF로 변환
 def create_papers_pdf(papers, filename="ai_papers_summary_2.pdf"):
+    # PDF 내보내기는 선택 기능이므로 ReportLab은 사용할 때만 import
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+
     doc = SimpleDocTemplate(filename, pagesize=A4)
     styles = getSampleStyleSheet()
 
@@ -122,38 +238,193 @@ def create_papers_pdf(papers, filename="ai_papers_summary_2.pdf"):
     return filename
 
 
-# 1. PDF에서 텍스트 추출
-def extract_text_from_pdf(pdf_path):
-    reader = PdfReader(pdf_path)
-    full_text = ""
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            full_text += text + "\n"
-    return full_text
+# 1. 논문 메타데이터를 논문 1편당 Document 1개로 변환
+def papers_to_documents(papers):
+    for paper in papers:
+        yield Document(
+            page_content=f"{paper['title']}\n\n{paper['summary']}",
+            metadata={
+                "title": paper["title"],
+                "authors": paper["authors"],
+                "published": paper["published"],
+                "arxiv_id": paper.get("arxiv_id", ""),
+            },
+        )
 
 
-# 2. 텍스트 분할 후 벡터스토어 생성
-def build_vectorstore_from_text(text, persist_dir="chroma2_db"):
-    documents = [Document(page_content=text)]
+# 2. Document를 배치 단위로 분할하여 벡터스토어에 추가
+def build_vectorstore_from_documents(documents, persist_dir="chroma2_db", batch_size=INGEST_BATCH_SIZE):
     splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    docs = splitter.split_documents(documents)
+    vectorstore = get_vector_store(persist_dir, get_openai_embeddings)
 
-    vectorstore = Chroma.from_documents(
-        docs, OpenAIEmbeddings(), persist_directory=persist_dir
-    )
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            _add_documents(vectorstore, splitter, batch)
+            batch = []
+    if batch:
+        _add_documents(vectorstore, splitter, batch)
 
     return vectorstore
 
 
-# 3. 전체 실행 함수
-def summarize_company_from_pdf(pdf_path, persist_dir):
-    text = extract_text_from_pdf(pdf_path)
+def _add_documents(vectorstore, splitter, documents):
+    chunks = []
+    ids = []
+    for document in documents:
+        for i, chunk in enumerate(splitter.split_documents([document])):
+            chunks.append(chunk)
+            # 같은 논문을 다시 색인해도 중복 저장되지 않도록 논문 id 기반 chunk id 사용
+            ids.append(f"{document.metadata['arxiv_id']}-{i}" if document.metadata.get("arxiv_id") else None)
+
+    if all(ids):
+        vectorstore.add_documents(chunks, ids=ids)
+    else:
+        vectorstore.add_documents(chunks)
+
+
+# 증분 수집 상태 (가장 최근에 색인한 논문의 published 시각과 arXiv id)
+def load_ingest_state(persist_dir):
+    path = os.path.join(persist_dir, INGEST_STATE_FILE)
+    if not os.path.exists(path):
+        return {"latest_published": "", "latest_ids": [], "last_checked": 0, "count": 0}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def reset_legacy_vectorstore(persist_dir):
+    """
+    수집 상태 파일 없이 만들어진 벡터 DB(이전 버전의 PDF 텍스트 기반 DB)를 비움
+
+    이전 chunk는 논문 id 기반 chunk id가 아니어서 다시 수집하면 같은 논문이 두 번 저장되므로
+    기존 chunk를 지우고 처음부터 다시 색인함
+    """
+    if not os.path.isdir(persist_dir):
+        return
+    vectorstore = get_vector_store(persist_dir, get_openai_embeddings)
+    count = vectorstore._collection.count()
+    if count:
+        logging.warning(f"수집 상태가 없는 기존 벡터 DB를 다시 구축합니다: {persist_dir} (chunk {count}개 삭제)")
+        vectorstore.reset_collection()
+
+
+def save_ingest_state(persist_dir, state):
+    os.makedirs(persist_dir, exist_ok=True)
+    path = os.path.join(persist_dir, INGEST_STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def filter_new_papers(papers, state):
+    """이미 색인한 논문보다 새로운 논문만 반환"""
+    latest = state.get("latest_published", "")
+    latest_ids = set(state.get("latest_ids", []))
+    return [
+        p
+        for p in papers
+        if p["published_at"] > latest
+        or (p["published_at"] == latest and p["arxiv_id"] not in latest_ids)
+    ]
+
+
+def advance_ingest_state(state, new_papers):
+    latest = state.get("latest_published", "")
+    latest_ids = set(state.get("latest_ids", []))
+    for p in new_papers:
+        if p["published_at"] > latest:
+            latest = p["published_at"]
+            latest_ids = {p["arxiv_id"]}
+        elif p["published_at"] == latest:
+            latest_ids.add(p["arxiv_id"])
+    return {
+        "latest_published": latest,
+        "latest_ids": sorted(latest_ids),
+        "last_checked": time.time(),
+        "count": state.get("count", 0) + len(new_papers),
+    }
 
-    logging.info(f"Vector DB 구축 중 (저장 경로: {persist_dir})")
-    vectorstore = build_vectorstore_from_text(text, persist_dir=persist_dir)
 
-    return vectorstore
+async def ingest_new_papers(persist_dir=PAPERS_DB_DIR):
+    """
+    최근 색인 이후에 등록된 arXiv 논문만 가져와 기존 벡터 DB에 추가
+
+    Returns:
+        새로 색인한 논문 수
+    """
+    async with _ingest_lock:
+        state = load_ingest_state(persist_dir)
+        if not os.path.exists(os.path.join(persist_dir, INGEST_STATE_FILE)):
+            await run_sync(reset_legacy_vectorstore, persist_dir)
+        logging.info(f"Vector DB 구축 중 (저장 경로: {persist_dir})")
+
+        harvested = 0
+        new_papers = []
+        batch = []
+        exported = [] if ARXIV_EXPORT_PDF else None
+        # 수집한 논문을 INGEST_BATCH_SIZE편씩 바로 색인하므로 전체 목록을 모아 두지 않음
+        since = state.get("latest_published", "")
+        # 증분 수집은 ARXIV_FETCH_SIZE에서 멈추지 않고 마지막으로 색인한 논문까지 페이지를 넘김
+        max_results = ARXIV_INCREMENTAL_MAX_FETCH if since else ARXIV_FETCH_SIZE
+        async for paper in harvest_arxiv_papers(ARXIV_QUERY, max_results=max_results, since=since):
+            harvested += 1
+            if not filter_new_papers([paper], state):
+                continue
+            batch.append(paper)
+            if len(batch) >= INGEST_BATCH_SIZE:
+                new_papers.extend(await _index_papers(batch, persist_dir, exported))
+                batch = []
+        if batch:
+            new_papers.extend(await _index_papers(batch, persist_dir, exported))
+
+        logging.info(f"총 {harvested}개의 논문 중 새 논문 {len(new_papers)}개")
+
+        if exported:
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            pdf_path = os.path.join(OUTPUT_DIR, "ai_papers_summary.pdf")
+            await run_sync(create_papers_pdf, exported, filename=pdf_path)
+
+        # 최신순으로 수집하므로 중간에 실패하면 상태를 갱신하지 않고 다음 수집에서 다시 가져옴
+        # (이미 색인한 논문은 chunk id가 같아 중복 저장되지 않음)
+        save_ingest_state(persist_dir, advance_ingest_state(state, new_papers))
+        return len(new_papers)
+
+
+async def _index_papers(papers, persist_dir, exported=None):
+    """논문 한 배치를 벡터 DB에 추가하고, 상태 갱신에 필요한 최소 정보만 반환"""
+    # 벡터 DB 구축은 동기 라이브러리이므로 워커 풀에서 실행
+    await run_sync(build_vectorstore_from_documents, papers_to_documents(papers), persist_dir=persist_dir)
+    if exported is not None:
+        exported.extend(papers)
+    return [{"published_at": p["published_at"], "arxiv_id": p["arxiv_id"]} for p in papers]
+
+
+async def _refresh_in_background(persist_dir):
+    try:
+        await ingest_new_papers(persist_dir)
+    except Exception as e:
+        logging.error(f"논문 증분 수집 실패: {e}")
+
+
+async def ensure_papers_indexed(persist_dir=PAPERS_DB_DIR):
+    """
+    논문 벡터 DB를 조회 가능한 상태로 준비
+
+    - 색인된 논문이 없으면 최초 수집을 기다림
+    - 이미 있으면 바로 반환하고, 갱신 주기가 지났으면 백그라운드에서 새 논문만 수집
+    """
+    state = load_ingest_state(persist_dir)
+    if state.get("count", 0) == 0:
+        await ingest_new_papers(persist_dir)
+        return
+
+    stale = time.time() - state.get("last_checked", 0) > ARXIV_REFRESH_INTERVAL
+    if stale and not _ingest_lock.locked():
+        task = asyncio.create_task(_refresh_in_background(persist_dir))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
 
 def extract_company_name(data: str) -> str:
@@ -167,20 +438,8 @@ async def get_tech_summary(data: str):
 
     logging.info(f"회사명: {company_name}")
 
-    query = 'cat:cs.AI OR cat:stat.ML OR all:"artificial intelligence" OR all:"deep learning"'
-    xml_data = fetch_arxiv_papers(query, max_results=300)
-    papers = parse_arxiv_response(xml_data)
-
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    pdf_path = os.path.join(output_dir, "ai_papers_summary.pdf")
-    logging.info(f"총 {len(papers)}개의 논문을 찾았습니다.")
-    pdf_file = create_papers_pdf(papers, filename=pdf_path)
-
-    # 벡터 DB 저장 경로 설정 및 생성
-    persist_dir = os.path.join(output_dir, "vector_db")
-    summarize_company_from_pdf(pdf_file, persist_dir=persist_dir)
+    # 기존 벡터 DB를 바로 사용하고, 새 논문은 필요할 때만 증분 수집
+    await ensure_papers_indexed(PAPERS_DB_DIR)
 
     # 비동기 기술 요약 실행
-    return tech_summary(company_name, db_path=persist_dir)
+    return await tech_summary(company_name, db_path=PAPERS_DB_DIR)
@@ -1,16 +1,19 @@
-from typing import Union
-from app.agents.startup_explorer_agent import StartupExplorerAgent
-from app.agents.invest_agent import get_invest_judgement
-from app.agents.competitor_compare_agent import compare_competitors
-from fastapi import APIRouter
+from typing import List, Union
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 
-from app.agents.open_ai import get_streaming_message_from_openai
-from app.agents.info_perform_agent import get_info_perform
-from app.agents.generate_report_agent import convert_report_to_pdf
+# 에이전트 모듈(LangChain, Chroma, ReportLab, 임베딩 모델 등)은 무거우므로
+# 서버 시작 시가 아니라 각 엔드포인트가 처음 호출될 때 import 함
+from app.core.search_cache import get_search_cache
+from app.core.jobs import job_manager, JobQueueFull, SUCCEEDED
+from app.core.llm_cache import bypass_llm_cache, get_llm_cache_stats
+from app.core.metrics import track_agent
+from app.core.rate_limit import get_limiter_stats
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
+import json
 import logging 
+import os
 from io import BytesIO # BytesIO 추가
 
 latest_report = None
@@ -23,6 +26,11 @@ class AskRequest(BaseModel):
 class ReportRequest(BaseModel):
     report_text: str
 
+class BatchExploreRequest(BaseModel):
+    targets: List[str] = []
+    count: int = 0
+    max_concurrency: Union[int, None] = None
+
 @router.post(
     "/ask",
     summary="Generate messages using OpenAI (streaming)",
@@ -36,6 +44,8 @@ async def get_generated_messages_with_header(
     - return: OpenAI의 응답을 스트리밍 방식으로 반환
     """
     
+    from app.agents.open_ai import get_streaming_message_from_openai
+
     return StreamingResponse(
         get_streaming_message_from_openai(request.data), 
         media_type="text/event-stream"
@@ -46,29 +56,39 @@ async def get_generated_messages_with_header(
     summary="Generate messages using OpenAI (streaming)",
 )
 async def get_generated_messages_with_header(
-    request: AskRequest
+    request: AskRequest,
+    no_cache: bool = False
 ):
     """
     ## Tavily로 기업 실적 및 창업자 정보 검색
     - data: 기업 정보 템플릿
+    - no_cache: True이면 캐시된 LLM 응답을 사용하지 않음
     - return: 기업 실적 및 창업자 정보 요약
     """
     
-    return await get_info_perform(request.data)
+    from app.agents.info_perform_agent import get_info_perform
+
+    with bypass_llm_cache(no_cache), track_agent("info_perform"):
+        return await get_info_perform(request.data)
 
 @router.post(
     "/competitor_compare",
     summary="Generate competitor analysis using OpenAI and Tavily",
 )
 async def get_competitor_analysis(
-    request: AskRequest
+    request: AskRequest,
+    no_cache: bool = False
 ):
     """
     ## Tavily로 경쟁사 비교 분석
     - data: 기업 정보 템플릿
+    - no_cache: True이면 캐시된 LLM 응답을 사용하지 않음
     - return: 경쟁사 목록 및 비교 분석 요약
     """
-    return await compare_competitors(request.data)
+    from app.agents.competitor_compare_agent import compare_competitors
+
+    with bypass_llm_cache(no_cache), track_agent("competitor"):
+        return await compare_competitors(request.data)
 
 @router.post(
     "/invest",
@@ -79,22 +99,256 @@ async def get_invest_analysis(
 ):
     return await get_invest_analysis(request.data)
   
+async def run_startup_pipeline(concurrent: bool, max_concurrency: Union[int, None], on_stage=None):
+    """스타트업 탐색부터 최종 보고서까지 실행하고 최신 보고서를 갱신"""
+    from app.agents.startup_explorer_agent import StartupExplorerAgent
+
+    explorer = StartupExplorerAgent()
+    startup_data = await explorer.supervisor(
+        concurrent=concurrent,
+        max_concurrency=max_concurrency,
+        on_stage=on_stage
+    )
+
+    global latest_report
+    latest_report = startup_data[5]  # 튜플의 6번째 요소(인덱스 5)가 최종 보고서
+
+    return startup_data
+
 @router.get(
     "/explore_startup",
     summary="Generate messages using OpenAI (streaming)",
 )
-async def get_startup_info():
+async def get_startup_info(
+    concurrent: bool = True,
+    max_concurrency: Union[int, None] = None,
+    no_cache: bool = False
+):
     """
     # Tavily로 스타트업 자료 검색하여 투자 검토 회사 선정
+    - concurrent: 분석 에이전트(실적/경쟁사/시장성/기술)를 동시에 실행할지 여부
+    - max_concurrency: 동시에 실행할 최대 에이전트 수
+    - no_cache: True이면 캐시된 LLM 응답을 사용하지 않음
     """
     
+    with bypass_llm_cache(no_cache):
+        return await run_startup_pipeline(concurrent, max_concurrency)
+
+async def stream_startup_events(
+    concurrent: bool,
+    max_concurrency: Union[int, None],
+    no_cache: bool,
+    stream_report: bool
+):
+    """에이전트가 끝날 때마다 결과를 SSE(data: ...) 형식으로 전송"""
+    from app.agents.startup_explorer_agent import StartupExplorerAgent
+
     explorer = StartupExplorerAgent()
-    startup_data = await explorer.supervisor()
-    
-    global latest_report
-    latest_report = startup_data[5]  # 튜플의 6번째 요소(인덱스 5)가 최종 보고서
+    try:
+        with bypass_llm_cache(no_cache):
+            async for stage, result in explorer.stream_supervisor(
+                concurrent=concurrent,
+                max_concurrency=max_concurrency,
+                stream_report=stream_report
+            ):
+                if stage == "final":
+                    global latest_report
+                    latest_report = result[5]
+                    continue
+                if stage == "report_token":
+                    event = {"stage": stage, "token": result}
+                else:
+                    event = {"stage": stage, "result": result}
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+    except Exception as e:
+        # 스트리밍이 시작된 뒤에는 HTTP 상태 코드를 바꿀 수 없으므로 오류도 이벤트로 전달
+        logging.error(f"Error occurred: {str(e)}", exc_info=True)
+        error = getattr(e, "detail", None) or str(e)
+        yield f"data: {json.dumps({'stage': 'error', 'error': error}, ensure_ascii=False)}\n\n"
 
-    return startup_data
+@router.get(
+    "/explore_startup/stream",
+    summary="Run the startup pipeline and stream each agent result (SSE)",
+)
+async def stream_startup_info(
+    concurrent: bool = True,
+    max_concurrency: Union[int, None] = None,
+    no_cache: bool = False,
+    stream_report: bool = True
+):
+    """
+    # 스타트업 탐색 파이프라인을 실행하며 에이전트별 결과를 스트리밍
+    - 파라미터는 /explore_startup과 동일
+    - stream_report: True이면 최종 보고서를 토큰 단위로 전송 (data: {"stage": "report_token", "token": ...})
+    - return: 각 단계(explorer, info_perform, competitor, market, tech, invest, report)가 끝날 때마다
+      data: {"stage": ..., "result": ...} 이벤트, 마지막에 data: [DONE]
+    """
+    return StreamingResponse(
+        stream_startup_events(concurrent, max_concurrency, no_cache, stream_report),
+        media_type="text/event-stream"
+    )
+
+@router.post(
+    "/explore_startup/jobs",
+    summary="Start the startup exploration pipeline as a background job",
+    status_code=202,
+)
+async def submit_startup_job(
+    concurrent: bool = True,
+    max_concurrency: Union[int, None] = None,
+    no_cache: bool = False
+):
+    """
+    ## 스타트업 탐색 파이프라인을 백그라운드 작업으로 실행
+    - 파라미터는 /explore_startup과 동일
+    - return: job_id (상태는 GET /jobs/{job_id}, 결과는 GET /jobs/{job_id}/result로 조회)
+    - 동시에 JOB_MAX_RUNNING개까지 실행하고 나머지는 대기, 대기열(JOB_MAX_QUEUED)이 차면 429
+    """
+    from app.agents.startup_explorer_agent import PIPELINE_STAGES
+
+    async def run(job):
+        return await run_startup_pipeline(
+            concurrent,
+            max_concurrency,
+            on_stage=lambda stage, status, result: job.set_stage(stage, status)
+        )
+
+    try:
+        with bypass_llm_cache(no_cache):
+            job = job_manager.submit("explore_startup", run, stages=PIPELINE_STAGES)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return job.to_dict()
+
+@router.post(
+    "/explore_startup/batch",
+    summary="Evaluate many startups concurrently as a background job",
+    status_code=202,
+)
+async def submit_batch_job(
+    request: BatchExploreRequest,
+    no_cache: bool = False
+):
+    """
+    ## 여러 스타트업을 동시에 분석하는 백그라운드 작업 실행
+    - targets: 분석할 회사명 목록 (중복 제거)
+    - count: 추가로 탐색하여 분석할 회사 수
+    - max_concurrency: 동시에 분석할 회사 수 (기본값: BATCH_MAX_CONCURRENCY)
+    - return: job_id (회사별 진행 상황은 GET /jobs/{job_id}, 결과는 GET /jobs/{job_id}/result)
+    - 동시에 JOB_MAX_RUNNING개까지 실행하고 나머지는 대기, 대기열(JOB_MAX_QUEUED)이 차면 429
+    """
+    from app.agents.batch_explorer import BatchExplorer, BATCH_MAX_CONCURRENCY, BATCH_JOB_OUTPUT_DIR
+
+    if not request.targets and request.count <= 0:
+        raise HTTPException(status_code=400, detail="targets 또는 count(1 이상)를 지정하세요.")
+
+    async def run(job):
+        explorer = BatchExplorer(
+            max_concurrency=request.max_concurrency or BATCH_MAX_CONCURRENCY,
+            # 작업마다 별도 파일에 기록하고, 이전 작업에서 분석한 회사도 요청하면 다시 분석
+            output_path=os.path.join(BATCH_JOB_OUTPUT_DIR, f"{job.id}.jsonl"),
+            on_company=job.set_stage
+        )
+        return await explorer.run(targets=request.targets, count=request.count)
+
+    try:
+        with bypass_llm_cache(no_cache):
+            job = job_manager.submit("explore_startup_batch", run)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return job.to_dict()
+
+@router.get(
+    "/jobs",
+    summary="List background jobs",
+)
+async def list_jobs():
+    """
+    ## 보관 중인 백그라운드 작업 목록
+    """
+    return [job.to_dict() for job in job_manager.list()]
+
+@router.get(
+    "/jobs/{job_id}",
+    summary="Get background job status and per-stage progress",
+)
+async def get_job_status(job_id: str):
+    """
+    ## 작업 상태 조회
+    - return: status(pending/running/succeeded/failed/cancelled), 단계별 진행 상황
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+@router.get(
+    "/jobs/{job_id}/result",
+    summary="Get the result of a finished background job",
+)
+async def get_job_result(job_id: str):
+    """
+    ## 작업 결과 조회
+    - return: /explore_startup과 동일한 결과 튜플 (완료 전이면 409)
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if job.status != SUCCEEDED:
+        return JSONResponse(content=job.to_dict(), status_code=409)
+    return job.result
+
+@router.delete(
+    "/jobs/{job_id}",
+    summary="Cancel a running background job",
+)
+async def cancel_job(job_id: str):
+    """
+    ## 실행 중인 작업 취소
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if not job_manager.cancel(job_id):
+        return JSONResponse(content=job.to_dict(), status_code=409)
+    return {"job_id": job_id, "status": "cancelling"}
+
+@router.get(
+    "/search_cache/stats",
+    summary="Tavily search cache statistics",
+)
+async def get_search_cache_stats():
+    """
+    ## 검색 캐시 통계
+    - return: 저장 항목 수, 출처(에이전트)별 hit/miss 횟수
+    """
+    return get_search_cache().stats()
+
+@router.get(
+    "/llm_cache/stats",
+    summary="LLM response cache statistics",
+)
+async def get_llm_cache_stats_route():
+    """
+    ## LLM 응답 캐시 통계
+    - return: 저장 항목 수, 크기, hit/miss 횟수
+    """
+    return get_llm_cache_stats()
+
+
+@router.get(
+    "/rate_limits/stats",
+    summary="Upstream rate limiter statistics",
+)
+async def get_rate_limit_stats_route():
+    """
+    ## 업스트림별 요청 한도 상태
+    - return: 현재/최대 동시 실행 한도, 처리 중 요청 수, 분당 요청 한도
+    """
+    return get_limiter_stats()
 
 @router.post(
     "/download_report",
@@ -124,7 +378,10 @@ async def download_report_pdf(
                     status_code=400
                 )
         
-        pdf_bytes = convert_report_to_pdf(report_text)
+        from app.agents.generate_report_agent import render_report_pdf
+
+        # 워커 풀에서 렌더링하고, 같은 보고서는 캐시된 PDF를 바로 반환
+        pdf_bytes = await render_report_pdf(report_text)
         filename = "startup_investment_report.pdf"
 
         headers = {
@@ -0,0 +1,79 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+_WORD_RE = re.compile(r"[0-9A-Za-z]+|[가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화
+
+    영문/숫자는 소문자 단어 단위, 한글은 단어와 함께 음절 bigram도 추가
+    (조사가 붙은 "시장규모는" / "시장 규모"처럼 띄어쓰기가 달라도 매칭되도록)
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        tokens.append(word)
+        if _HANGUL_RE.fullmatch(word) and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25:
+    """
+    메모리에서 바로 채점하는 Okapi BM25
+
+    단어 → (문서 번호, 빈도) 역색인을 두어 질의 단어가 들어 있는 문서만 채점하므로
+    문서 수가 많아도 질의 비용은 일치하는 문서 수에 비례함
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths = []
+        for i, doc in enumerate(documents):
+            tokens = Counter(tokenize(doc))
+            self.doc_lengths.append(sum(tokens.values()))
+            for term, tf in tokens.items():
+                self.postings[term].append((i, tf))
+        self.postings = dict(self.postings)
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+        n = len(self.doc_lengths)
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in self.postings.items()
+        }
+        # 문서 길이 정규화 항은 질의와 무관하므로 미리 계산
+        self._norms = [
+            k1 * (1 - b + b * (length / self.avg_length if self.avg_length else 0)) for length in self.doc_lengths
+        ]
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _sparse_scores(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self._norms[i])
+        return scores
+
+    def scores(self, query: str) -> List[float]:
+        """모든 문서의 점수 (질의 단어가 없는 문서는 0)"""
+        results = [0.0] * len(self.doc_lengths)
+        for i, score in self._sparse_scores(query).items():
+            results[i] = score
+        return results
+
+    def top(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """점수가 0보다 큰 문서 중 상위 k개의 (문서 번호, 점수), 동점이면 문서 순서"""
+        scores = self._sparse_scores(query)
+        return heapq.nsmallest(k, ((i, s) for i, s in scores.items() if s > 0), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from app.core.context_packing import count_tokens
+from app.core.rate_limit import RETRY_MAX_ATTEMPTS, call_with_retry, call_with_retry_sync, get_limiter, retry_delay
+
+# 응답 길이(max_tokens)를 지정하지 않은 호출에서 분당 토큰 예산에 미리 잡아 둘 응답 토큰 수
+OPENAI_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("OPENAI_COMPLETION_TOKEN_ESTIMATE", "1000"))
+
+# ChatOpenAI는 streaming=True이면 _agenerate 안에서 _astream을 호출하므로 슬롯을 한 번만 잡도록 표시
+_in_model_call: ContextVar[bool] = ContextVar("in_model_call", default=False)
+
+
+def estimate_chat_tokens(messages: Sequence[Union[BaseMessage, dict]], max_tokens: Optional[int] = None) -> int:
+    """채팅 호출 1회의 예상 토큰 수 (요청 전에 분당 토큰 예산을 잡는 용도, 실제 사용량으로 나중에 정산)"""
+    prompt_tokens = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else message.content
+        prompt_tokens += count_tokens(content if isinstance(content, str) else str(content or ""))
+    return prompt_tokens + (max_tokens or OPENAI_COMPLETION_TOKEN_ESTIMATE)
+
+
+def _total_tokens(result: ChatResult) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+class RateLimitedChatOpenAI(ChatOpenAI):
+    """
+    모델 호출(API 요청) 1회마다 업스트림 한도 슬롯을 하나씩 잡는 ChatOpenAI
+
+    - 요청 간격/분당 토큰 수/동시 요청 수/업스트림 메트릭은 rate_limit의 "openai" 한도로 관리
+    - 재시도는 rate_limit(call_with_retry) 한 곳에서 수행하고 SDK 자체 재시도는 끔
+      (429/5xx가 AIMD 동시성 조절과 메트릭에 반영되고, 백오프 동안 슬롯을 잡고 있지 않음)
+    - LLM 캐시 hit은 _agenerate까지 오지 않으므로 한도를 소모하지 않음
+    """
+
+    upstream: str = "openai"
+    max_retries: Optional[int] = 0
+
+    def _estimate_tokens(self, messages: List[BaseMessage]) -> int:
+        return estimate_chat_tokens(messages, self.max_tokens)
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if _in_model_call.get():
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        estimated = self._estimate_tokens(messages)
+        token = _in_model_call.set(True)
+        try:
+            result = call_with_retry_sync(
+                self.upstream, super()._generate, messages, stop=stop, run_manager=run_manager,
+                tokens=estimated, **kwargs
+            )
+        finally:
+            _in_model_call.reset(token)
+        get_limiter(self.upstream).record_tokens(estimated, _total_tokens(result))
+        return result
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if _in_model_call.get():
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        estimated = self._estimate_tokens(messages)
+        token = _in_model_call.set(True)
+        try:
+            result = await call_with_retry(
+                self.upstream, super()._agenerate, messages, stop=stop, run_manager=run_manager,
+                tokens=estimated, **kwargs
+            )
+        finally:
+            _in_model_call.reset(token)
+        get_limiter(self.upstream).record_tokens(estimated, _total_tokens(result))
+        return result
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if _in_model_call.get():
+            yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+        limiter = get_limiter(self.upstream)
+        estimated = self._estimate_tokens(messages)
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            started = False
+            try:
+                with limiter.sync_slot(estimated):
+                    for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                # 첫 chunk를 받기 전에 실패한 경우만 재시도 (이미 내보낸 응답이 중복되지 않도록)
+                delay = None if started else retry_delay(self.upstream, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if _in_model_call.get():
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+        limiter = get_limiter(self.upstream)
+        estimated = self._estimate_tokens(messages)
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            started = False
+            try:
+                # 스트리밍은 마지막 chunk를 받을 때까지 슬롯을 유지 (동시 요청 수에 포함)
+                async with limiter.slot(estimated):
+                    async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                # 첫 chunk를 받기 전에 실패한 경우만 재시도 (이미 내보낸 응답이 중복되지 않도록)
+                delay = None if started else retry_delay(self.upstream, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
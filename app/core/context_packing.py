@@ -0,0 +1,187 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.bm25 import BM25, tokenize
+
+# 에이전트별 프롬프트 자료(검색 결과, 특허 초록 등)에 쓸 최대 토큰 수
+# CONTEXT_BUDGET_<AGENT> 환경 변수로 덮어쓸 수 있음
+DEFAULT_CONTEXT_BUDGETS = {
+    "explorer": 4000,
+    "info_perform": 3000,
+    "competitor": 4000,
+    "market": 6000,
+    "tech_keywords": 4000,
+    "tech": 8000,
+}
+DEFAULT_CONTEXT_BUDGET = 4000
+
+# 토큰 계산 기준 모델 (에이전트 대부분이 gpt-4o 계열 → o200k_base 인코딩)
+TOKENIZER_MODEL = os.getenv("CONTEXT_TOKENIZER_MODEL", "gpt-4o-mini")
+
+# 이미 고른 자료와 단어 집합이 이 비율 이상 겹치면 중복으로 보고 제외
+DUPLICATE_THRESHOLD = 0.8
+
+# 남은 예산이 이보다 적으면 잘라서라도 넣지 않고 멈춤
+MIN_SNIPPET_TOKENS = 50
+
+# 긴 자료 하나가 예산을 독차지하지 않도록 자료 1건에 쓸 수 있는 예산 비율
+MAX_SNIPPET_SHARE = 0.25
+
+
+def get_context_budget(agent: str) -> int:
+    default = DEFAULT_CONTEXT_BUDGETS.get(agent, DEFAULT_CONTEXT_BUDGET)
+    return int(os.getenv(f"CONTEXT_BUDGET_{agent.upper()}", default))
+
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    # tiktoken은 인코딩 파일을 처음 한 번 내려받으므로, 실패하면 글자 수 기반 추정으로 대체
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    except Exception as e:
+        logging.warning(f"tiktoken 인코딩을 불러오지 못해 글자 수로 토큰 수를 추정합니다: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        # 한글은 대략 1글자 ≈ 1토큰, 영문은 4글자 ≈ 1토큰 → 보수적으로 2글자 ≈ 1토큰
+        return (len(text) + 1) // 2
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * 2]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def to_snippets(results: Any) -> List[Dict[str, str]]:
+    """
+    Tavily 검색 결과(list[{"url", "content"}])나 문자열을 {"source", "text"} 목록으로 변환
+
+    검색 오류 시 Tavily 도구는 오류 문자열을 반환하므로 그대로 하나의 자료로 취급
+    """
+    if not results:
+        return []
+    if isinstance(results, str):
+        return [{"source": "", "text": results}]
+    snippets = []
+    for item in results:
+        if isinstance(item, dict):
+            text = item.get("content") or item.get("text") or ""
+            source = item.get("url") or item.get("source") or item.get("title") or ""
+        else:
+            text, source = str(item), ""
+        if text.strip():
+            snippets.append({"source": source, "text": text.strip()})
+    return snippets
+
+
+def merge_search_results(result_lists: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    여러 검색어의 결과를 순서대로 합치면서 같은 URL은 한 번만 남김
+
+    검색 오류(문자열 결과)는 건너뜀
+    """
+    merged = []
+    seen_urls = set()
+    for results in result_lists:
+        if isinstance(results, str):
+            logging.warning(f"검색 결과 대신 오류가 반환되어 제외합니다: {results[:200]}")
+            continue
+        for item in results or []:
+            url = item.get("url") if isinstance(item, dict) else None
+            if url and url in seen_urls:
+                continue
+            if url:
+                seen_urls.add(url)
+            merged.append(item)
+    return merged
+
+
+def _is_duplicate(terms: set, selected_terms: List[set]) -> bool:
+    for other in selected_terms:
+        union = len(terms | other)
+        if union and len(terms & other) / union >= DUPLICATE_THRESHOLD:
+            return True
+    return False
+
+
+def select_snippets(
+    snippets: Sequence[Dict[str, str]],
+    query: str,
+    budget: int,
+    separator: str = "\n\n",
+) -> List[Tuple[int, str]]:
+    """
+    질문과의 관련도(BM25) 순으로 토큰 예산 안에 들어가는 자료를 골라 (원래 인덱스, 본문) 목록으로 반환
+
+    - 같은 출처(URL)나 내용이 거의 같은 자료는 한 번만 포함
+    - 관련도가 같으면 원래 순서(검색 순위)를 유지
+    - 자료 1건은 예산의 MAX_SNIPPET_SHARE까지만, 남은 예산이 부족하면 남은 만큼 잘라서 포함
+    """
+    if not snippets:
+        return []
+    max_snippet_tokens = max(MIN_SNIPPET_TOKENS, int(budget * MAX_SNIPPET_SHARE))
+
+    scores = BM25([s["text"] for s in snippets]).scores(query)
+    order = sorted(range(len(snippets)), key=lambda i: (-scores[i], i))
+
+    selected: List[Tuple[int, str]] = []
+    seen_sources = set()
+    selected_terms: List[set] = []
+    used = 0
+    separator_tokens = count_tokens(separator)
+    for i in order:
+        snippet = snippets[i]
+        source = snippet.get("source", "")
+        if source and source in seen_sources:
+            continue
+        terms = set(tokenize(snippet["text"]))
+        if _is_duplicate(terms, selected_terms):
+            continue
+
+        block = f"[{len(selected) + 1}] {source}\n{snippet['text']}" if source else snippet["text"]
+        remaining = budget - used - (separator_tokens if selected else 0)
+        if remaining < MIN_SNIPPET_TOKENS:
+            break
+        limit = min(remaining, max_snippet_tokens)
+        block_tokens = count_tokens(block)
+        if block_tokens > limit:
+            block = truncate_to_tokens(block, limit)
+            block_tokens = count_tokens(block)
+
+        selected.append((i, block))
+        seen_sources.add(source)
+        selected_terms.append(terms)
+        used += block_tokens + (separator_tokens if len(selected) > 1 else 0)
+
+    logging.debug(f"컨텍스트 압축: 자료 {len(snippets)}건 중 {len(selected)}건, {used}/{budget} 토큰")
+    return selected
+
+
+def pack_context(
+    snippets: Sequence[Dict[str, str]],
+    query: str,
+    budget: int,
+    separator: str = "\n\n",
+) -> str:
+    """select_snippets로 고른 자료를 하나의 프롬프트용 문자열로 조립"""
+    return separator.join(block for _, block in select_snippets(snippets, query, budget, separator))
+
+
+def pack_search_results(results: Any, query: str, agent: str, budget: Optional[int] = None) -> str:
+    """검색 결과를 에이전트 예산에 맞춰 압축한 프롬프트용 문자열 반환"""
+    return pack_context(to_snippets(results), query, budget or get_context_budget(agent))
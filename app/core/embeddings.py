@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.rate_limit import call_with_retry, call_with_retry_sync
+from app.core.sqlite_lru import evict_lru
+from app.core.workers import run_sync
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join("output", "cache", "embedding_cache.sqlite3")
+)
+# 캐시 최대 항목 수 / 최대 크기 (벡터 1개 ≈ 12KB, text-embedding-ada-002 기준)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(600 * 1024 * 1024)))
+# 임베딩 API 한 번에 보낼 텍스트 수 / 동시에 보낼 요청 수
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+
+class EmbeddingCache:
+    """
+    텍스트 해시 → 임베딩 벡터를 저장하는 SQLite 캐시
+
+    크기 제한: 항목 수(max_entries) 또는 전체 크기(max_bytes) 초과 시 LRU 순으로 삭제
+    """
+
+    def __init__(
+        self,
+        path: str = EMBEDDING_CACHE_PATH,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                cache_key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL DEFAULT 0,
+                last_accessed REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # 크기 제한 이전에 만든 캐시 파일은 컬럼을 추가해서 그대로 사용
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embedding_cache)")}
+        if "size" not in columns:
+            self._conn.execute("ALTER TABLE embedding_cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE embedding_cache SET size = length(vector)")
+        if "last_accessed" not in columns:
+            self._conn.execute("ALTER TABLE embedding_cache ADD COLUMN last_accessed REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_accessed ON embedding_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, vector FROM embedding_cache WHERE cache_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET last_accessed = ? WHERE cache_key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]):
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = array("d", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (cache_key, vector, size, last_accessed) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        removed = evict_lru(self._conn, "embedding_cache", self.max_entries, self.max_bytes)
+        if removed:
+            logging.info(f"임베딩 캐시 {removed}건 삭제")
+
+
+class CachedBatchEmbeddings(Embeddings):
+    """
+    배치 크기와 동시 요청 수를 제어하고, 같은 텍스트는 다시 임베딩하지 않는 Embeddings 래퍼
+
+    - 캐시 키: 임베딩 모델명 + 텍스트의 sha256
+    - 캐시에 없는 텍스트만 batch_size 단위로 나누어 최대 max_concurrency개 요청을 동시에 전송
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        namespace: Optional[str] = None,
+        upstream: str = "openai",
+    ):
+        self.underlying = underlying
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.namespace = namespace or getattr(underlying, "model", type(underlying).__name__)
+        # 요청 한도/재시도를 적용할 업스트림 이름 (app.core.rate_limit)
+        self.upstream = upstream
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\n{text}".encode("utf-8")).hexdigest()
+
+    def _plan(self, texts: List[str]):
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+        # 캐시에 없는 텍스트는 중복을 제거하여 한 번만 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        batches = [
+            list(missing.items())[i:i + self.batch_size]
+            for i in range(0, len(missing), self.batch_size)
+        ]
+        if texts:
+            logging.info(f"임베딩 캐시 hit {len(texts) - len(missing)}/{len(texts)}, 배치 {len(batches)}개")
+        return keys, cached, batches
+
+    def _store(self, batch, vectors, cached):
+        computed = {key: vector for (key, _), vector in zip(batch, vectors)}
+        self.cache.set_many(computed)
+        cached.update(computed)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, batches = self._plan(texts)
+
+        def embed_batch(batch):
+            return call_with_retry_sync(
+                self.upstream, self.underlying.embed_documents, [text for _, text in batch]
+            )
+
+        if len(batches) == 1:
+            self._store(batches[0], embed_batch(batches[0]), cached)
+        elif batches:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                for batch, vectors in zip(batches, pool.map(embed_batch, batches)):
+                    self._store(batch, vectors, cached)
+
+        return [cached[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # SQLite 조회/저장은 이벤트 루프를 막지 않도록 워커 풀에서 실행
+        keys, cached, batches = await run_sync(self._plan, texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch):
+            async with semaphore:
+                vectors = await call_with_retry(
+                    self.upstream, self.underlying.aembed_documents, [text for _, text in batch]
+                )
+            await run_sync(self._store, batch, vectors, cached)
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = self.cache.get_many([key])
+        if key not in cached:
+            cached[key] = call_with_retry_sync(self.upstream, self.underlying.embed_query, text)
+            self.cache.set_many({key: cached[key]})
+        return cached[key]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = await run_sync(self.cache.get_many, [key])
+        if key not in cached:
+            cached[key] = await call_with_retry(self.upstream, self.underlying.aembed_query, text)
+            await run_sync(self.cache.set_many, {key: cached[key]})
+        return cached[key]
+
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+
+def get_openai_embeddings() -> CachedBatchEmbeddings:
+    """논문 벡터 DB용 OpenAI 임베딩 (프로세스 전체에서 공유)"""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            from langchain_community.embeddings import OpenAIEmbeddings
+
+            # 재시도는 CachedBatchEmbeddings(call_with_retry)에서만 수행
+            _embeddings = CachedBatchEmbeddings(OpenAIEmbeddings(max_retries=0))
+        return _embeddings
@@ -0,0 +1,231 @@
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.bm25 import BM25, tokenize
+from app.core.hybrid_search import reciprocal_rank_fusion
+from app.core.metrics import EVIDENCE_LOOKUPS
+from app.core.search_cache import normalize_query
+from app.core.workers import run_sync
+
+# EVIDENCE_STORE=0 이면 실행 단위 근거 저장소를 사용하지 않음 (모든 검색을 그대로 수행)
+EVIDENCE_STORE_ENABLED = os.getenv("EVIDENCE_STORE", "1") == "1"
+# 다른 검색어도 저장된 문서로 충분히 답할 수 있으면 웹 검색을 생략 (키워드 기준, 아래 기준으로 보수적으로 판단)
+# EVIDENCE_FUZZY=0 이면 같은 검색어를 다시 검색할 때만 저장된 결과를 사용
+EVIDENCE_FUZZY_ENABLED = os.getenv("EVIDENCE_FUZZY", "1") == "1"
+# EVIDENCE_VECTOR=1 이면 위 판단에 벡터 유사도도 사용 (검색 결과마다 임베딩 호출이 추가됨)
+EVIDENCE_VECTOR_ENABLED = os.getenv("EVIDENCE_VECTOR", "0") == "1"
+
+# 저장된 문서가 "이미 답할 수 있는 자료"로 인정되는 기준
+# - 검색어 단어 중 문서에 포함된 비율 (다른 하위 질문의 자료로 답하지 않도록 엄격하게)
+EVIDENCE_MIN_TERM_COVERAGE = float(os.getenv("EVIDENCE_MIN_TERM_COVERAGE", "0.9"))
+# - 검색어와 문서 임베딩의 코사인 유사도 (벡터 사용 시)
+EVIDENCE_MIN_SIMILARITY = float(os.getenv("EVIDENCE_MIN_SIMILARITY", "0.8"))
+# - 위 기준을 넘는 문서가 최소 몇 건 있어야 웹 검색을 생략할지 (max_results보다 크면 max_results 기준)
+EVIDENCE_MIN_HITS = int(os.getenv("EVIDENCE_MIN_HITS", "3"))
+
+# 임베딩할 때 문서 앞부분만 사용 (검색 결과 본문은 보통 이보다 짧음)
+EMBEDDING_TEXT_LIMIT = 2000
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class EvidenceStore:
+    """
+    파이프라인 실행 1회 동안 에이전트들이 가져온 웹 검색 결과를 모아 두는 저장소
+
+    - 같은 검색어는 실행 중 한 번만 웹으로 나감
+    - 문서는 URL 단위로 중복 없이 보관하고 키워드(BM25) 색인에 추가
+    - fuzzy=True 이면 보관한 문서를 키워드와 (embeddings가 있으면) 벡터 유사도로 로컬 검색하여,
+      충분한 자료가 있으면 다른 검색어의 웹 검색도 생략
+    """
+
+    def __init__(self, embeddings: Optional[Embeddings] = None, fuzzy: bool = True):
+        self.fuzzy = fuzzy
+        # 벡터 유사도는 fuzzy 판단에만 쓰이므로 fuzzy가 아니면 임베딩하지 않음
+        self.embeddings = embeddings if fuzzy else None
+        self.documents: List[Dict[str, Any]] = []
+        self._urls = set()
+        # 정규화된 검색어 → (요청한 max_results, 검색 결과)
+        self._queries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._bm25: Optional[BM25] = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _disable_vectors(self, error: Exception):
+        if self.embeddings is not None:
+            logging.warning(f"근거 저장소 임베딩 실패, 키워드 검색만 사용합니다: {error}")
+            self.embeddings = None
+
+    # ---- 저장 ----
+
+    def _add_results(self, results: Any, query: str, source: str, max_results: int) -> List[Dict[str, Any]]:
+        """새 문서만 저장하고 반환 (벡터는 호출한 쪽에서 채움)"""
+        if not isinstance(results, list):
+            # 검색 오류 문자열 등은 저장하지 않음
+            return []
+        new_documents = []
+        with self._lock:
+            self._queries[normalize_query(query)] = (max_results, results)
+            for item in results:
+                if not isinstance(item, dict):
+                    continue
+                url = item.get("url")
+                content = (item.get("content") or "").strip()
+                if not url or not content or url in self._urls:
+                    continue
+                self._urls.add(url)
+                document = {
+                    "url": url,
+                    "content": content,
+                    "query": query,
+                    "source": source,
+                    "terms": set(tokenize(content)),
+                    "vector": None,
+                }
+                self.documents.append(document)
+                new_documents.append(document)
+            if new_documents:
+                self._bm25 = None
+        return new_documents
+
+    def _set_vectors(self, documents: List[Dict[str, Any]], vectors: List[List[float]]):
+        with self._lock:
+            for document, vector in zip(documents, vectors):
+                document["vector"] = vector
+
+    def add(self, results: Any, query: str, source: str = "", max_results: int = 5) -> int:
+        """검색 결과를 저장하고 새로 추가된 문서 수 반환"""
+        new_documents = self._add_results(results, query, source, max_results)
+        if new_documents and self.embeddings is not None:
+            try:
+                texts = [doc["content"][:EMBEDDING_TEXT_LIMIT] for doc in new_documents]
+                self._set_vectors(new_documents, self.embeddings.embed_documents(texts))
+            except Exception as e:
+                self._disable_vectors(e)
+        return len(new_documents)
+
+    async def aadd(self, results: Any, query: str, source: str = "", max_results: int = 5) -> int:
+        new_documents = self._add_results(results, query, source, max_results)
+        if new_documents and self.embeddings is not None:
+            try:
+                texts = [doc["content"][:EMBEDDING_TEXT_LIMIT] for doc in new_documents]
+                self._set_vectors(new_documents, await self.embeddings.aembed_documents(texts))
+            except Exception as e:
+                self._disable_vectors(e)
+        return len(new_documents)
+
+    # ---- 조회 ----
+
+    def _rank(self, query: str, query_vector: Optional[List[float]], max_results: int):
+        with self._lock:
+            documents = list(self.documents)
+            vectors = [doc["vector"] for doc in documents]
+            if self._bm25 is None:
+                self._bm25 = BM25([doc["content"] for doc in documents])
+            bm25 = self._bm25
+
+        query_terms = {term for term in tokenize(query) if len(term) > 1}
+        lexical_scores = bm25.scores(query)
+        rankings = [sorted(range(len(documents)), key=lambda i: -lexical_scores[i])]
+
+        similarities = None
+        if query_vector is not None:
+            similarities = [_cosine(query_vector, v) if v is not None else 0.0 for v in vectors]
+            rankings.append(sorted(range(len(documents)), key=lambda i: -similarities[i]))
+        rrf = reciprocal_rank_fusion(rankings)
+
+        hits = []
+        for i, document in enumerate(documents):
+            coverage = len(query_terms & document["terms"]) / len(query_terms) if query_terms else 0.0
+            if coverage < EVIDENCE_MIN_TERM_COVERAGE:
+                continue
+            if similarities is not None and similarities[i] < EVIDENCE_MIN_SIMILARITY:
+                continue
+            hits.append(i)
+
+        if len(hits) < min(EVIDENCE_MIN_HITS, max_results):
+            return None
+        hits.sort(key=lambda i: -rrf[i])
+        return [{"url": documents[i]["url"], "content": documents[i]["content"]} for i in hits[:max_results]]
+
+    def _lookup_query(self, query: str, max_results: int):
+        """같은 검색어를 같은 수 이상의 결과로 이미 검색했다면 그 결과를 그대로 사용"""
+        with self._lock:
+            previous = self._queries.get(normalize_query(query))
+        if previous is not None and previous[0] >= max_results:
+            return previous[1][:max_results]
+        return None
+
+    def _record(self, source: str, query: str, results) -> Optional[List[Dict[str, Any]]]:
+        EVIDENCE_LOOKUPS.labels(source or "default", "hit" if results is not None else "miss").inc()
+        if results is not None:
+            logging.info(f"[{source}] 근거 저장소 사용 (웹 검색 생략): {query}")
+        return results
+
+    def lookup(self, query: str, max_results: int = 5, source: str = "") -> Optional[List[Dict[str, Any]]]:
+        """저장된 문서로 충분히 답할 수 있으면 Tavily 결과 형식(list[{"url", "content"}])으로 반환, 아니면 None"""
+        results = self._lookup_query(query, max_results)
+        if results is None and self.fuzzy and self.documents:
+            query_vector = None
+            if self.embeddings is not None:
+                try:
+                    query_vector = self.embeddings.embed_query(query)
+                except Exception as e:
+                    self._disable_vectors(e)
+            results = self._rank(query, query_vector, max_results)
+        return self._record(source, query, results)
+
+    async def alookup(self, query: str, max_results: int = 5, source: str = "") -> Optional[List[Dict[str, Any]]]:
+        results = self._lookup_query(query, max_results)
+        if results is None and self.fuzzy and self.documents:
+            query_vector = None
+            if self.embeddings is not None:
+                try:
+                    query_vector = await self.embeddings.aembed_query(query)
+                except Exception as e:
+                    self._disable_vectors(e)
+            # 문서 수가 많으면 채점이 이벤트 루프를 막지 않도록 워커 풀에서 실행
+            results = await run_sync(self._rank, query, query_vector, max_results)
+        return self._record(source, query, results)
+
+
+_current_store: ContextVar[Optional[EvidenceStore]] = ContextVar("evidence_store", default=None)
+
+
+def get_evidence_store() -> Optional[EvidenceStore]:
+    """현재 실행(supervisor) 범위의 근거 저장소, 없으면 None"""
+    return _current_store.get()
+
+
+def create_evidence_store() -> Optional[EvidenceStore]:
+    if not EVIDENCE_STORE_ENABLED:
+        return None
+    embeddings = None
+    if EVIDENCE_FUZZY_ENABLED and EVIDENCE_VECTOR_ENABLED:
+        from app.core.embeddings import get_openai_embeddings
+
+        embeddings = get_openai_embeddings()
+    return EvidenceStore(embeddings, fuzzy=EVIDENCE_FUZZY_ENABLED)
+
+
+@contextmanager
+def use_evidence_store(store: Optional[EvidenceStore]):
+    """블록 안에서 실행되는 검색 도구가 store를 공유하도록 설정 (하위 asyncio 작업에도 전달됨)"""
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
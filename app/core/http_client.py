@@ -0,0 +1,104 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import weakref
+from typing import Any, Optional
+
+import httpx
+
+from app.core.rate_limit import call_with_retry
+
+# 데이터 소스(KIPRIS, arXiv 등) 요청 공통 타임아웃 (초)
+# 연결은 빨리 포기하고, 응답 대기(read)는 느린 API를 감안해 길게 둠
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "10"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+
+# 커넥션 풀 크기 / 유휴 keep-alive 연결 수와 유지 시간 (초)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# 연결 실패(ConnectError 등)만 전송 계층에서 바로 재시도하는 횟수
+# 429/5xx/타임아웃은 request()에서 업스트림 한도와 함께 백오프 재시도
+HTTP_CONNECT_RETRIES = int(os.getenv("HTTP_CONNECT_RETRIES", "2"))
+
+# HTTP/2는 h2 패키지가 설치되어 있을 때만 사용 (HTTP2=0 이면 끔)
+HTTP2_ENABLED = os.getenv("HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+USER_AGENT = os.getenv("HTTP_USER_AGENT", "SKALA-RAG-Agent/1.0")
+
+
+def default_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    """공통 타임아웃 (read만 업스트림별로 바꿀 수 있음)"""
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=read if read is not None else HTTP_READ_TIMEOUT,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": default_timeout(),
+        "headers": {"User-Agent": USER_AGENT},
+        "follow_redirects": True,
+        "http2": HTTP2_ENABLED,
+    }
+
+
+# httpx.AsyncClient의 연결은 만든 이벤트 루프에 묶이므로 루프마다 하나씩 유지
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프에서 공유하는 비동기 HTTP 클라이언트"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        transport = httpx.AsyncHTTPTransport(retries=HTTP_CONNECT_RETRIES, http2=HTTP2_ENABLED, limits=_limits())
+        client = httpx.AsyncClient(transport=transport, **_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+async def request(upstream: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    공유 클라이언트로 요청하고 성공(2xx) 응답 반환
+
+    Args:
+        upstream: 업스트림 한도/재시도/메트릭에 쓸 이름 ("kipris", "arxiv" 등)
+        kwargs: httpx 요청 인자 (params, headers, timeout 등)
+
+    업스트림 한도 안에서 보내고, 429/5xx/타임아웃이면 백오프 후 재시도
+    """
+    client = get_async_client()
+
+    async def send():
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    return await call_with_retry(upstream, send)
+
+
+async def close_http_clients():
+    """애플리케이션 종료 시 공유 HTTP 클라이언트의 연결 정리"""
+    for client in list(_async_clients.values()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            # 다른 (이미 닫힌) 이벤트 루프에서 만든 클라이언트는 닫지 못할 수 있음
+            logging.warning(f"HTTP 클라이언트 종료 실패: {e}")
+    _async_clients.clear()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from app.core.bm25 import BM25
+from app.core.metrics import track_operation
+from app.core.workers import run_sync
+
+# 질의(키워드) 하나당 BM25 / 벡터 검색에서 가져올 후보 수
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+
+# RRF(reciprocal rank fusion) 상수
+RRF_K = 60
+
+# 색인 생성 시 Chroma에서 한 번에 읽을 chunk 수
+INDEX_LOAD_BATCH_SIZE = 1000
+
+
+class KeywordIndex:
+    """Chroma 컬렉션의 chunk 전체에 대한 BM25 역색인 (chunk id, 본문, 메타데이터 포함)"""
+
+    def __init__(self, ids: List[str], texts: List[str], metadatas: List[Optional[dict]]):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        # chunk id → 색인 내 위치 (검색 결과 조립용)
+        self.positions = {doc_id: i for i, doc_id in enumerate(ids)}
+        self.bm25 = BM25(texts)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "KeywordIndex":
+        ids, texts, metadatas = [], [], []
+        offset = 0
+        while True:
+            page = vectorstore.get(limit=INDEX_LOAD_BATCH_SIZE, offset=offset, include=["documents", "metadatas"])
+            if not page["ids"]:
+                break
+            ids.extend(page["ids"])
+            texts.extend(text or "" for text in page["documents"])
+            metadatas.extend(page["metadatas"])
+            offset += len(page["ids"])
+        return cls(ids, texts, metadatas)
+
+    def search(self, query: str, k: int) -> List[str]:
+        return [self.ids[i] for i, _ in self.bm25.top(query, k)]
+
+
+# 컬렉션 → (색인 당시 chunk 수, 색인)
+_indexes: Dict[int, tuple] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(vectorstore) -> KeywordIndex:
+    """
+    벡터 DB의 BM25 색인을 프로세스당 한 번 만들어 재사용
+
+    논문 증분 수집으로 chunk 수가 바뀌면 다음 조회 때 다시 만듦
+    """
+    collection = vectorstore._collection
+    count = collection.count()
+    with _indexes_lock:
+        cached = _indexes.get(id(collection))
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        logging.info(f"논문 키워드 색인 생성: chunk {count}개")
+        index = KeywordIndex.from_vectorstore(vectorstore)
+        _indexes[id(collection)] = (count, index)
+        return index
+
+
+def _vector_search(vectorstore, vectors: List[List[float]], k: int) -> List[List[str]]:
+    """질의 벡터 여러 개를 Chroma 조회 한 번으로 검색해 질의별 chunk id 목록 반환"""
+    count = vectorstore._collection.count()
+    if not count:
+        return [[] for _ in vectors]
+    result = vectorstore._collection.query(query_embeddings=vectors, n_results=min(k, count), include=[])
+    return result["ids"]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = RRF_K) -> Dict[Hashable, float]:
+    """순위 목록 여러 개를 RRF 점수로 합침 (항목은 chunk id, 문서 위치 등 같은 기준의 식별자)"""
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (k + rank + 1)
+    return scores
+
+
+async def hybrid_search(
+    vectorstore,
+    queries: Sequence[str],
+    top_k: int = 5,
+    candidates: int = HYBRID_CANDIDATES,
+) -> List[Document]:
+    """
+    키워드별 BM25 검색과 벡터 검색 결과를 RRF로 합쳐 상위 top_k개 문서 반환
+
+    - 질의 임베딩은 한 번의 배치 호출, 벡터 검색도 Chroma 조회 한 번으로 처리
+    - 같은 논문(arxiv_id)의 chunk는 가장 높은 순위 하나만 남김
+    - 임베딩/벡터 검색이 실패하면 BM25 결과만 사용
+    """
+    queries = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+    if not queries:
+        return []
+
+    async def keyword_rankings():
+        with track_operation("keyword_search"):
+            index = await run_sync(get_keyword_index, vectorstore)
+            return index, [index.search(query, candidates) for query in queries]
+
+    async def vector_rankings():
+        try:
+            with track_operation("vector_search"):
+                vectors = await vectorstore.embeddings.aembed_documents(list(queries))
+                return await run_sync(_vector_search, vectorstore, vectors, candidates)
+        except Exception as e:
+            logging.warning(f"벡터 검색 실패, 키워드 검색 결과만 사용합니다: {e}")
+            return []
+
+    (index, lexical), dense = await asyncio.gather(keyword_rankings(), vector_rankings())
+    fused = reciprocal_rank_fusion([*lexical, *dense])
+
+    documents = []
+    seen_papers = set()
+    for doc_id in sorted(fused, key=lambda d: -fused[d]):
+        i = index.positions.get(doc_id)
+        if i is None:
+            # 색인을 만든 뒤 추가된 chunk는 다음 색인 갱신 때 포함
+            continue
+        metadata = index.metadatas[i] or {}
+        paper = metadata.get("arxiv_id") or doc_id
+        if paper in seen_papers:
+            continue
+        seen_papers.add(paper)
+        documents.append(Document(page_content=index.texts[i], metadata={**metadata, "rrf_score": fused[doc_id]}))
+        if len(documents) >= top_k:
+            break
+    return documents
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# 완료된 작업 결과 보관 시간 (초) / 최대 보관 작업 수
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", str(3600)))
+JOB_MAX_RETAINED = int(os.getenv("JOB_MAX_RETAINED", "100"))
+# 동시에 실행할 작업 수 / 실행을 기다리며 대기열에 둘 수 있는 작업 수
+JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "10"))
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """실행 중 + 대기 중인 작업 수가 한도에 도달해 새 작업을 받을 수 없음"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stages: Dict[str, str] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def set_stage(self, stage: str, status: str):
+        self.stages[stage] = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": dict(self.stages),
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    오래 걸리는 파이프라인을 백그라운드 asyncio 작업으로 실행하고 상태를 보관
+
+    - 동시에 max_running개까지만 실행하고, 나머지는 pending 상태로 순서대로 대기
+    - 대기 중인 작업이 max_queued개를 넘으면 submit()에서 JobQueueFull 발생
+    - 완료된 작업은 JOB_RESULT_TTL 동안만 보관하며, 보관 개수가 JOB_MAX_RETAINED를 넘으면
+      가장 오래전에 끝난 작업부터 삭제함
+    """
+
+    def __init__(
+        self,
+        result_ttl: int = JOB_RESULT_TTL,
+        max_retained: int = JOB_MAX_RETAINED,
+        max_running: int = JOB_MAX_RUNNING,
+        max_queued: int = JOB_MAX_QUEUED,
+    ):
+        self.result_ttl = result_ttl
+        self.max_retained = max_retained
+        self.max_running = max(1, max_running)
+        self.max_queued = max(0, max_queued)
+        self._jobs: Dict[str, Job] = {}
+        self._slots = asyncio.Semaphore(self.max_running)
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[Job], Awaitable[Any]],
+        stages: Optional[List[str]] = None,
+    ) -> Job:
+        """
+        작업 등록 후 즉시 반환
+
+        Args:
+            kind: 작업 종류 (예: "explore_startup")
+            run: Job을 받아 실행되는 코루틴 함수 - 진행 상황은 job.set_stage로 기록
+            stages: 미리 "pending"으로 표시할 단계 목록
+
+        Raises:
+            JobQueueFull: 실행 중 + 대기 중인 작업이 max_running + max_queued개 이상일 때
+        """
+        self._cleanup()
+        active = sum(1 for job in self._jobs.values() if not job.finished)
+        if active >= self.max_running + self.max_queued:
+            raise JobQueueFull(f"처리 중인 작업이 너무 많습니다 ({active}건). 잠시 후 다시 시도하세요.")
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        for stage in stages or []:
+            job.set_stage(stage, PENDING)
+        self._jobs[job.id] = job
+        # create_task는 현재 contextvars를 복사하므로 요청 단위 설정(캐시 우회 등)이 유지됨
+        job.task = asyncio.create_task(self._run(job, run))
+        return job
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[Any]]):
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.result = await run(job)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logging.error(f"작업 실패 ({job.kind} {job.id}): {e}", exc_info=True)
+            job.status = FAILED
+            job.error = getattr(e, "detail", None) or str(e)
+        finally:
+            job.finished_at = time.time()
+            job.task = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._cleanup()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    def list(self) -> List[Job]:
+        self._cleanup()
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _cleanup(self):
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished:
+            if now - job.finished_at > self.result_ttl:
+                del self._jobs[job.id]
+
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at
+        )
+        overflow = len(self._jobs) - self.max_retained
+        for job in finished[:max(0, overflow)]:
+            del self._jobs[job.id]
+
+    def cancel_all(self):
+        for job in self._jobs.values():
+            if not job.finished and job.task is not None:
+                job.task.cancel()
+
+
+job_manager = JobManager()
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.http_client import default_timeout, request
+from app.core.workers import run_sync
+
+KIPRIS_SEARCH_URL = "http://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getAdvancedSearch"
+
+# KIPRIS 응답 대기 타임아웃 (초, 연결 타임아웃 등은 공통 HTTP 설정을 따름)
+KIPRIS_TIMEOUT = float(os.getenv("KIPRIS_TIMEOUT", "30"))
+# 한 페이지당 특허 수 / 출원인 1명당 최대 페이지 수 / 동시에 요청할 페이지 수
+KIPRIS_PAGE_SIZE = int(os.getenv("KIPRIS_PAGE_SIZE", "100"))
+KIPRIS_MAX_PAGES = int(os.getenv("KIPRIS_MAX_PAGES", "20"))
+KIPRIS_PAGE_CONCURRENCY = int(os.getenv("KIPRIS_PAGE_CONCURRENCY", "4"))
+
+# 특허 캐시 저장 위치 / 캐시를 그대로 쓰는 기간 (특허 목록은 주 단위로 바뀜)
+PATENT_CACHE_PATH = os.getenv("PATENT_CACHE_PATH", os.path.join("output", "cache", "patent_cache.sqlite3"))
+PATENT_CACHE_TTL = int(os.getenv("PATENT_CACHE_TTL", str(7 * 24 * 3600)))
+# 증분 갱신은 최신 출원일자 이후만 가져오므로, 늦게 공개된 과거 출원을 반영하도록 주기적으로 전체 갱신
+PATENT_FULL_REFRESH_INTERVAL = int(os.getenv("PATENT_FULL_REFRESH_INTERVAL", str(30 * 24 * 3600)))
+
+# 출원인 이름 정규화 시 제거할 법인 표기
+_CORPORATE_MARKS = re.compile(r"\(주\)|㈜|주식회사|\(유\)|유한회사|co\.?,?\s*ltd\.?|inc\.?|corp\.?", re.IGNORECASE)
+
+
+def normalize_applicant(name: str) -> str:
+    """"(주)뤼튼", "뤼튼 주식회사", "뤼튼"을 같은 출원인으로 보도록 정규화"""
+    name = _CORPORATE_MARKS.sub(" ", str(name))
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+def parse_patents(xml_text: str) -> Dict[str, Any]:
+    """KIPRIS 응답 XML → {"total": 전체 건수, "patents": [특허 dict]}"""
+    root = ET.fromstring(xml_text)
+    result_code = root.findtext(".//resultCode", default="")
+    if result_code not in ("", "00"):
+        raise RuntimeError(f"KIPRIS 오류 ({result_code}): {root.findtext('.//resultMsg', default='')}")
+
+    patents = []
+    for item in root.findall(".//item"):
+        patent = {
+            "출원인": item.findtext("applicantName", default=""),
+            "출원일자": item.findtext("applicationDate", default=""),
+            "출원번호": item.findtext("applicationNumber", default=""),
+            "초록": item.findtext("astrtCont", default=""),
+            "발명의명칭": item.findtext("inventionTitle", default=""),
+            "IPC번호": item.findtext("ipcNumber", default=""),
+            "공개일자": item.findtext("openDate", default=""),
+            "공개번호": item.findtext("openNumber", default=""),
+            "등록상태": item.findtext("registerStatus", default=""),
+        }
+        patents.append(patent)
+
+    total = root.findtext(".//totalCount", default="")
+    return {"total": int(total) if total.isdigit() else len(patents), "patents": patents}
+
+
+async def fetch_patent_page(applicant_name: str, page: int) -> Dict[str, Any]:
+    """출원일자 최신순으로 정렬된 특허 목록의 한 페이지"""
+    params = {
+        "ServiceKey": os.getenv("KIPRIS_API_KEY"),
+        "applicant": applicant_name,
+        "pageNo": page,
+        "numOfRows": KIPRIS_PAGE_SIZE,
+        "sortSpec": "AD",
+        "descSort": True,
+    }
+
+    response = await request("kipris", "GET", KIPRIS_SEARCH_URL, params=params, timeout=default_timeout(KIPRIS_TIMEOUT))
+    return parse_patents(response.text)
+
+
+async def fetch_all_patents(applicant_name: str) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    출원인의 특허를 모든 페이지에서 가져옴
+
+    첫 페이지로 전체 건수를 확인한 뒤 나머지 페이지는 KIPRIS_PAGE_CONCURRENCY개씩 동시에 요청
+
+    Returns:
+        (특허 목록, 모든 페이지를 가져왔는지 여부) - 일부 페이지가 실패해도 성공한 페이지는 반환
+    """
+    first = await fetch_patent_page(applicant_name, 1)
+    pages = min(KIPRIS_MAX_PAGES, math.ceil(first["total"] / KIPRIS_PAGE_SIZE))
+    if first["total"] > KIPRIS_MAX_PAGES * KIPRIS_PAGE_SIZE:
+        logging.warning(
+            f"[{applicant_name}] 특허 {first['total']}건 중 최근 {KIPRIS_MAX_PAGES * KIPRIS_PAGE_SIZE}건만 가져옵니다"
+        )
+
+    semaphore = asyncio.Semaphore(max(1, KIPRIS_PAGE_CONCURRENCY))
+
+    async def fetch(page):
+        async with semaphore:
+            return await fetch_patent_page(applicant_name, page)
+
+    rest = await asyncio.gather(*(fetch(page) for page in range(2, pages + 1)), return_exceptions=True)
+
+    patents = list(first["patents"])
+    failed = 0
+    for page, result in enumerate(rest, 2):
+        if isinstance(result, Exception):
+            failed += 1
+            logging.warning(f"[{applicant_name}] 특허 {page}페이지 조회 실패: {result}")
+            continue
+        patents.extend(result["patents"])
+    return _dedupe(patents), failed == 0
+
+
+async def fetch_patents_since(applicant_name: str, since: str) -> List[Dict[str, str]]:
+    """
+    출원일자가 since(YYYYMMDD) 이후인 특허만 가져옴
+
+    최신순으로 한 페이지씩 가져오다가 since 이전 출원이 나오면 중단
+    since 당일 출원은 캐시 이후에 추가되었을 수 있으므로 포함 (이미 있는 특허는 _dedupe로 제거)
+    """
+    patents = []
+    for page in range(1, KIPRIS_MAX_PAGES + 1):
+        result = await fetch_patent_page(applicant_name, page)
+        newer = [p for p in result["patents"] if p["출원일자"] >= since]
+        patents.extend(newer)
+        if len(newer) < len(result["patents"]) or page * KIPRIS_PAGE_SIZE >= result["total"]:
+            break
+    return patents
+
+
+def _dedupe(patents: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """출원번호 기준 중복 제거 (앞쪽 항목 유지)"""
+    seen = set()
+    unique = []
+    for patent in patents:
+        key = patent.get("출원번호") or patent.get("발명의명칭")
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(patent)
+    return unique
+
+
+def latest_application_date(patents: List[Dict[str, str]]) -> str:
+    return max((p.get("출원일자", "") for p in patents), default="")
+
+
+class PatentCache:
+    """정규화된 출원인 이름 → 특허 목록을 저장하는 SQLite 캐시"""
+
+    def __init__(self, path: str = PATENT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS patent_cache (
+                applicant_key TEXT PRIMARY KEY,
+                patents TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                full_fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, applicant_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT patents, fetched_at, full_fetched_at FROM patent_cache WHERE applicant_key = ?",
+                (normalize_applicant(applicant_name),),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"patents": json.loads(row[0]), "fetched_at": row[1], "full_fetched_at": row[2]}
+
+    def set(self, applicant_name: str, patents: List[Dict[str, str]], full_fetched_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO patent_cache (applicant_key, patents, fetched_at, full_fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    normalize_applicant(applicant_name),
+                    json.dumps(patents, ensure_ascii=False),
+                    time.time(),
+                    full_fetched_at,
+                ),
+            )
+            self._conn.commit()
+
+
+_patent_cache: Optional[PatentCache] = None
+_patent_cache_lock = threading.Lock()
+# 같은 출원인을 동시에 조회하면 KIPRIS 요청은 한 번만 보내도록 출원인별 잠금
+# 잠금을 기다리거나 잡고 있는 요청이 없어지면 자동으로 제거됨
+_applicant_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def get_patent_cache() -> PatentCache:
+    global _patent_cache
+    with _patent_cache_lock:
+        if _patent_cache is None:
+            _patent_cache = PatentCache()
+        return _patent_cache
+
+
+async def get_patents(applicant_name: str) -> List[Dict[str, str]]:
+    """
+    출원인의 전체 특허 목록 (출원일자 최신순)
+
+    - 캐시가 PATENT_CACHE_TTL 이내면 그대로 사용
+    - 만료되었으면 캐시된 최신 출원일자 이후 특허만 가져와 합침 (증분 갱신)
+    - 처음 조회하거나 PATENT_FULL_REFRESH_INTERVAL이 지났으면 전체 페이지를 다시 가져옴
+    - KIPRIS 요청이 실패하면 만료된 캐시라도 반환
+    """
+    key = normalize_applicant(applicant_name)
+    lock = _applicant_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _applicant_locks[key] = lock
+    async with lock:
+        cache = get_patent_cache()
+        cached = await run_sync(cache.get, applicant_name)
+        now = time.time()
+        if cached is not None and now - cached["fetched_at"] < PATENT_CACHE_TTL:
+            logging.info(f"특허 캐시 사용: {applicant_name} ({len(cached['patents'])}건)")
+            return cached["patents"]
+
+        try:
+            if cached is not None and cached["patents"] and now - cached["full_fetched_at"] < PATENT_FULL_REFRESH_INTERVAL:
+                since = latest_application_date(cached["patents"])
+                newer = await fetch_patents_since(applicant_name, since)
+                logging.info(f"특허 증분 갱신: {applicant_name} (출원일자 {since} 이후 {len(newer)}건)")
+                patents = _dedupe(newer + cached["patents"])
+                full_fetched_at = cached["full_fetched_at"]
+            else:
+                patents, complete = await fetch_all_patents(applicant_name)
+                # 일부 페이지가 빠졌으면 다음 갱신 때 다시 전체를 가져오도록 전체 갱신 시각을 남기지 않음
+                full_fetched_at = now if complete else 0.0
+        except Exception as e:
+            if cached is None:
+                raise
+            logging.warning(f"KIPRIS 조회 실패, 만료된 특허 캐시 사용: {applicant_name} ({e})")
+            return cached["patents"]
+
+        await run_sync(cache.set, applicant_name, patents, full_fetched_at)
+        return patents
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Sequence, Union
+
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.core.sqlite_lru import evict_lru
+
+# LLM_CACHE: sqlite(기본) / memory / off
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE", "sqlite")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("output", "cache", "llm_cache.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# 요청 단위 캐시 우회 플래그 (True이면 조회를 건너뛰고 새 응답으로 캐시를 갱신)
+_bypass_llm_cache: ContextVar[bool] = ContextVar("bypass_llm_cache", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """with 블록 안에서 실행되는 체인은 캐시된 응답 대신 실제 LLM을 호출"""
+    token = _bypass_llm_cache.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass_llm_cache.reset(token)
+
+
+class SQLiteLRUCache(BaseCache):
+    """
+    LangChain LLM 응답을 SQLite에 저장하는 정확 일치(exact-match) 캐시
+
+    - 키: 렌더링된 프롬프트 + llm_string(모델명, temperature 등 호출 파라미터)의 해시
+    - 크기 제한: 항목 수(max_entries) 또는 전체 크기(max_bytes) 초과 시 LRU 순으로 삭제
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass_llm_cache.get():
+            return None
+
+        key = self._make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_accessed = ? WHERE cache_key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        try:
+            return [loads(generation) for generation in json.loads(row[0])]
+        except Exception as e:
+            logging.warning(f"LLM 캐시 역직렬화 실패, 캐시 무시: {e}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._make_key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (cache_key, llm_string, value, size, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, llm_string, value, len(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        removed = evict_lru(self._conn, "llm_cache", self.max_entries, self.max_bytes)
+        if removed:
+            logging.info(f"LLM 캐시 {removed}건 삭제")
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total_size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class BypassableInMemoryCache(InMemoryCache):
+    """프로세스 메모리 캐시 (요청 단위 우회 플래그 지원)"""
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass_llm_cache.get():
+            return None
+        return super().lookup(prompt, llm_string)
+
+
+def configure_llm_cache(backend: Union[str, BaseCache, None] = None) -> Optional[BaseCache]:
+    """
+    전역 LangChain LLM 캐시 설정
+
+    Args:
+        backend: "sqlite" / "memory" / "off" 또는 BaseCache 인스턴스 (기본값: LLM_CACHE 환경 변수)
+    """
+    if backend is None:
+        backend = LLM_CACHE_BACKEND
+
+    if isinstance(backend, BaseCache):
+        cache = backend
+    elif backend == "sqlite":
+        cache = SQLiteLRUCache()
+    elif backend == "memory":
+        cache = BypassableInMemoryCache(maxsize=LLM_CACHE_MAX_ENTRIES)
+    elif backend in ("off", "none", ""):
+        cache = None
+    else:
+        raise ValueError(f"지원하지 않는 LLM_CACHE 값입니다: {backend}")
+
+    set_llm_cache(cache)
+    logging.info(f"LLM 캐시 설정: {type(cache).__name__ if cache else '사용 안 함'}")
+    return cache
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    cache = get_llm_cache()
+    if isinstance(cache, SQLiteLRUCache):
+        return cache.stats()
+    return {"backend": type(cache).__name__ if cache else None}
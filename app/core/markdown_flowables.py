@@ -0,0 +1,200 @@
+"""
+보고서 Markdown → ReportLab flowable 변환
+
+줄 단위로 한 번만 훑으면서(single pass) 미리 컴파일한 정규식 하나로 블록 종류를 판별하고,
+인라인 서식과 XML 이스케이프도 정규식 한 번의 치환으로 처리합니다.
+
+지원 블록: 제목(#, 첫 줄의 **제목**, **1. 소제목**), 문단, 중첩 목록(순서 있음/없음),
+표(| a | b |), 코드 블록(```), 구분선(---), 빈 줄
+지원 인라인: **굵게**, *기울임*, `코드`, [텍스트](링크)
+"""
+import re
+from typing import Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1
+from reportlab.platypus import HRFlowable, Paragraph, Preformatted, Spacer, Table, TableStyle
+
+# 블록 판별용 정규식 (lastgroup으로 종류를 구분)
+_BLOCK_RE = re.compile(
+    r"(?P<fence>^\s*```)"
+    r"|(?P<hr>^\s*(?:-{3,}|\*{3,}|_{3,})\s*$)"
+    r"|(?P<heading>^(?P<hashes>#{1,6})\s+(?P<heading_text>.*?)\s*#*\s*$)"
+    r"|(?P<table>^\s*\|.*\|\s*$)"
+    r"|(?P<item>^(?P<indent>[ \t]*)(?P<marker>[*+-]|\d+[.)])\s+(?P<item_text>.*)$)"
+    r"|(?P<numbered_heading>^\s*\*\*\d+\..*?\*\*)"
+    r"|(?P<bold_line>^\s*\*\*.+\*\*\s*$)"
+)
+
+# 표 구분 줄: | --- | :---: |
+_TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)*\|?\s*$")
+
+# 인라인 서식 + XML 이스케이프를 한 번에 처리
+_INLINE_RE = re.compile(
+    r"\*\*(?P<bold>.+?)\*\*"
+    r"|`(?P<code>[^`]+)`"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\)"
+    r"|(?<![\w*])\*(?P<italic>[^*\s][^*]*?)\*(?![\w*])"
+    r"|(?P<amp>&)|(?P<lt><)|(?P<gt>>)"
+)
+
+_ESCAPES = {"amp": "&amp;", "lt": "&lt;", "gt": "&gt;"}
+
+# 목록 한 단계당 들여쓰기 (pt) / Markdown 들여쓰기 한 단계의 공백 수
+LIST_INDENT = 15
+LIST_SPACES_PER_LEVEL = 2
+
+
+def _inline_sub(match: "re.Match") -> str:
+    kind = match.lastgroup
+    if kind in _ESCAPES:
+        return _ESCAPES[kind]
+    if kind == "bold":
+        return f"<b>{render_inline(match.group('bold'))}</b>"
+    if kind == "italic":
+        return f"<i>{render_inline(match.group('italic'))}</i>"
+    if kind == "code":
+        return f'<font color="#c7254e">{escape(match.group("code"))}</font>'
+    if kind == "link_url":
+        url = escape(match.group("link_url")).replace('"', "&quot;")
+        return f'<link href="{url}" color="blue">{render_inline(match.group("link_text"))}</link>'
+    return match.group(0)
+
+
+def render_inline(text: str) -> str:
+    """Markdown 인라인 서식을 ReportLab Paragraph 마크업으로 변환 (XML 특수 문자 이스케이프 포함)"""
+    return _INLINE_RE.sub(_inline_sub, text)
+
+
+def escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+class MarkdownFlowables:
+    """
+    보고서 Markdown을 flowable 목록으로 변환
+
+    styles에는 ReportTitle, ReportHeading, ReportSubheading, ReportBody, ReportList,
+    ReportCode, ReportTableCell, ReportTableHeader 스타일이 있어야 함
+    """
+
+    def __init__(self, styles: StyleSheet1, available_width: float):
+        self.styles = styles
+        self.available_width = available_width
+        self._list_styles: Dict[int, ParagraphStyle] = {}
+
+    def _list_style(self, level: int) -> ParagraphStyle:
+        style = self._list_styles.get(level)
+        if style is None:
+            base = self.styles["ReportList"]
+            style = ParagraphStyle(
+                name=f"ReportList{level}",
+                parent=base,
+                leftIndent=base.leftIndent + LIST_INDENT * level,
+                bulletIndent=base.leftIndent + LIST_INDENT * level - 12,
+            )
+            self._list_styles[level] = style
+        return style
+
+    def _table(self, rows: List[str]) -> Table:
+        has_header = len(rows) > 1 and _TABLE_SEPARATOR_RE.match(rows[1]) is not None
+        cells = [_split_row(row) for row in rows if not _TABLE_SEPARATOR_RE.match(row)]
+        columns = max(len(row) for row in cells)
+
+        data = []
+        for r, row in enumerate(cells):
+            style = self.styles["ReportTableHeader" if has_header and r == 0 else "ReportTableCell"]
+            row = row + [""] * (columns - len(row))
+            data.append([Paragraph(render_inline(cell), style) for cell in row])
+
+        table = Table(
+            data,
+            colWidths=[self.available_width / columns] * columns,
+            repeatRows=1 if has_header else 0,
+        )
+        commands = [
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]
+        if has_header:
+            commands.append(("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#eeeeee")))
+        table.setStyle(TableStyle(commands))
+        return table
+
+    def convert(self, content: str) -> List:
+        styles = self.styles
+        story = []
+        title_added = False
+        table_rows: List[str] = []
+        code_lines: Optional[List[str]] = None
+
+        def flush_table():
+            if table_rows:
+                story.append(self._table(table_rows))
+                story.append(Spacer(1, 6))
+                table_rows.clear()
+
+        for line in content.split("\n"):
+            # 코드 블록 내부는 닫는 ``` 가 나올 때까지 그대로 보관
+            if code_lines is not None:
+                if line.lstrip().startswith("```"):
+                    story.append(Preformatted("\n".join(code_lines), styles["ReportCode"]))
+                    code_lines = None
+                else:
+                    code_lines.append(line)
+                continue
+
+            stripped = line.strip()
+            match = _BLOCK_RE.match(line) if stripped else None
+            # 중첩 그룹 중 가장 바깥 그룹이 마지막에 닫히므로 lastgroup이 곧 블록 종류
+            kind = match.lastgroup if match else None
+
+            if kind != "table":
+                flush_table()
+
+            if not stripped:
+                story.append(Spacer(1, 6))
+            elif kind == "fence":
+                code_lines = []
+            elif kind == "table":
+                table_rows.append(line)
+            elif kind == "hr":
+                story.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceBefore=4, spaceAfter=4))
+            elif kind == "heading":
+                level = len(match.group("hashes"))
+                text = render_inline(match.group("heading_text"))
+                if level == 1 and not title_added:
+                    story.append(Paragraph(text, styles["ReportTitle"]))
+                    title_added = True
+                else:
+                    story.append(Paragraph(text, styles["ReportHeading" if level <= 2 else "ReportSubheading"]))
+            elif kind == "bold_line" and not title_added:
+                # 첫 번째 '**'로 시작하고 끝나는 줄은 보고서 제목
+                story.append(Paragraph(render_inline(stripped[2:-2]), styles["ReportTitle"]))
+                title_added = True
+            elif kind == "numbered_heading":
+                story.append(Paragraph(render_inline(stripped), styles["ReportHeading"]))
+            elif kind == "item":
+                indent = match.group("indent").expandtabs(4)
+                level = len(indent) // LIST_SPACES_PER_LEVEL
+                marker = match.group("marker")
+                bullet = marker if marker[0].isdigit() else "•"
+                story.append(
+                    Paragraph(render_inline(match.group("item_text")), self._list_style(level), bulletText=bullet)
+                )
+            else:
+                story.append(Paragraph(render_inline(stripped), styles["ReportBody"]))
+
+        flush_table()
+        if code_lines:
+            # 닫히지 않은 코드 블록도 내용은 출력
+            story.append(Preformatted("\n".join(code_lines), styles["ReportCode"]))
+        return story
+
+
+def markdown_to_flowables(content: str, styles: StyleSheet1, available_width: float) -> List:
+    return MarkdownFlowables(styles, available_width).convert(content)
@@ -0,0 +1,176 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# LLM 호출은 수십 초까지 걸리므로 기본 버킷(최대 10초)보다 넓게 설정
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+AGENT_LATENCY = Histogram(
+    "agent_duration_seconds", "에이전트 단계별 실행 시간", ["agent"], buckets=LATENCY_BUCKETS
+)
+AGENT_IN_FLIGHT = Gauge("agent_in_flight", "실행 중인 에이전트 단계 수", ["agent"])
+AGENT_ERRORS = Counter("agent_errors_total", "실패한 에이전트 단계 수", ["agent"])
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "외부 API 요청 1회(시도 단위)의 응답 시간",
+    ["upstream", "agent"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge("upstream_in_flight", "처리 중인 외부 API 요청 수", ["upstream"])
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "외부 API 오류 수 (throttled / server_error / error)", ["upstream", "kind"]
+)
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "외부 API 재시도 횟수", ["upstream"])
+
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "모델별 LLM 호출 시간", ["model", "agent"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens_total", "모델별 사용 토큰 수", ["model", "agent", "type"])
+
+OPERATION_LATENCY = Histogram(
+    "operation_duration_seconds",
+    "내부 작업(벡터 검색, PDF 생성 등) 실행 시간",
+    ["operation", "agent"],
+    buckets=LATENCY_BUCKETS,
+)
+
+EVIDENCE_LOOKUPS = Counter(
+    "evidence_store_lookups_total", "실행 단위 근거 저장소 조회 수 (hit이면 웹 검색 생략)", ["source", "result"]
+)
+
+# 현재 실행 중인 에이전트 이름 (supervisor 단계 또는 단일 에이전트 엔드포인트에서 설정)
+_current_agent: ContextVar[str] = ContextVar("current_agent", default="none")
+
+
+def current_agent() -> str:
+    return _current_agent.get()
+
+
+@contextmanager
+def track_agent(agent: str):
+    """블록 안의 호출을 agent 라벨로 묶고, 실행 시간/동시 실행 수/실패 횟수를 기록"""
+    token = _current_agent.set(agent)
+    AGENT_IN_FLIGHT.labels(agent).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        AGENT_ERRORS.labels(agent).inc()
+        raise
+    finally:
+        AGENT_LATENCY.labels(agent).observe(time.perf_counter() - start)
+        AGENT_IN_FLIGHT.labels(agent).dec()
+        _current_agent.reset(token)
+
+
+@contextmanager
+def track_upstream(upstream: str):
+    """외부 API 요청 1회의 응답 시간과 처리 중 요청 수 기록"""
+    UPSTREAM_IN_FLIGHT.labels(upstream).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        UPSTREAM_LATENCY.labels(upstream, current_agent()).observe(time.perf_counter() - start)
+        UPSTREAM_IN_FLIGHT.labels(upstream).dec()
+
+
+def record_upstream_error(upstream: str, kind: str):
+    UPSTREAM_ERRORS.labels(upstream, kind).inc()
+
+
+def record_upstream_retry(upstream: str):
+    UPSTREAM_RETRIES.labels(upstream).inc()
+
+
+@contextmanager
+def track_operation(operation: str):
+    """Chroma 검색, PDF 생성처럼 외부 API가 아닌 작업의 실행 시간 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        OPERATION_LATENCY.labels(operation, current_agent()).observe(time.perf_counter() - start)
+
+
+def record_llm_call(model: str, duration: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+    agent = current_agent()
+    LLM_LATENCY.labels(model, agent).observe(duration)
+    if prompt_tokens:
+        LLM_TOKENS.labels(model, agent, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model, agent, "completion").inc(completion_tokens)
+
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain 채팅 모델 호출마다 모델별 시간과 토큰 수를 기록하는 콜백
+
+    LLM 캐시에서 응답한 경우에는 API를 호출하지 않았으므로 기록하지 않음
+    (캐시 응답은 llm_output이 없고 스트리밍 토큰도 발생하지 않음)
+    """
+
+    # 기록만 하므로 이벤트 루프에서 바로 실행 (스레드 풀로 넘기지 않음)
+    run_inline = True
+
+    def __init__(self):
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or "unknown"
+        self._runs[run_id] = {"model": model, "start": time.perf_counter(), "streamed": False}
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        run = self._runs.get(run_id)
+        if run is not None:
+            run["streamed"] = True
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        llm_output = response.llm_output or {}
+        usage = llm_output.get("token_usage")
+        if usage:
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+        elif run["streamed"]:
+            prompt_tokens, completion_tokens = _usage_from_generations(response)
+        else:
+            return
+        model = llm_output.get("model_name") or run["model"]
+        record_llm_call(model, time.perf_counter() - run["start"], prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._runs.pop(run_id, None)
+
+
+def _usage_from_generations(response: LLMResult):
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += usage.get("input_tokens", 0)
+            completion_tokens += usage.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+# 모든 LangChain 실행에 콜백을 자동으로 붙임 (체인마다 callbacks를 넘길 필요 없음)
+_llm_metrics_handler: ContextVar[Optional[BaseCallbackHandler]] = ContextVar(
+    "llm_metrics_handler", default=LLMMetricsCallbackHandler()
+)
+register_configure_hook(_llm_metrics_handler, inheritable=True)
+
+
+def render_metrics():
+    """Prometheus text exposition 형식의 (본문, content-type) 반환"""
+    return generate_latest(), CONTENT_TYPE_LATEST
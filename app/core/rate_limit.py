@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.metrics import record_upstream_error, record_upstream_retry, track_upstream
+
+# 업스트림별 기본 한도: (분당 요청 수, 최대 동시 요청 수)
+# RATE_LIMIT_<UPSTREAM>_RPM / RATE_LIMIT_<UPSTREAM>_CONCURRENCY 환경 변수로 덮어쓸 수 있음
+DEFAULT_LIMITS = {
+    "openai": (500, 16),
+    "tavily": (100, 8),
+    "kipris": (60, 4),
+    "arxiv": (20, 1),  # arXiv API 권장 간격: 3초에 1회
+}
+
+# 업스트림별 토큰 버킷 크기 (쉬다가 몰아서 보낼 수 있는 요청 수), 없으면 약 5초 분량
+# RATE_LIMIT_<UPSTREAM>_BURST 환경 변수로 덮어쓸 수 있음
+DEFAULT_BURSTS = {
+    "arxiv": 1,  # 버스트 없이 항상 3초 간격 유지
+}
+
+# 업스트림별 분당 토큰 수 (LLM 호출만 해당, 없으면 토큰 예산 없음)
+# RATE_LIMIT_<UPSTREAM>_TPM 환경 변수로 덮어쓸 수 있음
+DEFAULT_TOKEN_LIMITS = {
+    "openai": 200000,
+}
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30.0"))
+
+# 깨우는 신호를 놓친 경우에 대비해 대기 중 상태를 다시 확인하는 최대 간격 (초)
+_MAX_IDLE_WAIT = 1.0
+
+THROTTLED = "throttled"
+SERVER_ERROR = "server_error"
+
+
+class UpstreamLimiter:
+    """
+    업스트림 하나에 대한 요청 예산과 동시성 제한
+
+    - 토큰 버킷: 분당 요청 수(requests_per_minute)를 넘지 않도록 요청 간격 조절
+    - 분당 토큰 수(tokens_per_minute): LLM 호출은 예상 토큰 수만큼 예산을 잡고, 응답의 실제 사용량으로 정산
+    - AIMD 동시성: 성공하면 한도를 조금씩 늘리고(additive increase),
+      429/5xx를 받으면 한도를 절반으로 줄임(multiplicative decrease)
+    - 대기열: 슬롯은 요청한 순서(FIFO)대로 배정하여 오래 기다린 요청이 밀려나지 않음
+
+    스레드와 이벤트 루프 모두에서 사용할 수 있도록 상태는 threading.Lock으로 보호하고,
+    대기열 맨 앞의 요청만 슬롯을 시도하며 슬롯이 반납되면 다음 요청을 깨움
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        burst: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        if burst is None:
+            burst = min(requests_per_minute / 60.0 * 5, requests_per_minute)
+        self.capacity = max(1.0, float(burst))
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._tokens = self.capacity
+        # LLM 토큰 예산은 1분 분량까지 모아 둘 수 있음 (사용량이 예상보다 많으면 음수가 되어 다음 요청이 기다림)
+        self.token_rate = tokens_per_minute / 60.0 if tokens_per_minute else None
+        self.token_capacity = float(tokens_per_minute) if tokens_per_minute else 0.0
+        self._llm_tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiters: "deque[_Waiter]" = deque()
+
+    def _try_acquire(self, tokens: int) -> Optional[float]:
+        """
+        슬롯을 얻으면 0, 요청/토큰 예산이 모자라면 채워질 때까지 기다릴 시간(초),
+        동시 요청 한도가 찼으면 None(슬롯 반납 시 깨움) 반환 (self._lock 안에서 호출)
+        """
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        if self.token_rate:
+            self._llm_tokens = min(self.token_capacity, self._llm_tokens + elapsed * self.token_rate)
+        self._updated = now
+
+        if self.in_flight >= int(self.limit):
+            return None
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        if self.token_rate and tokens:
+            # 1분 예산보다 큰 요청도 예산이 가득 차면 보냄
+            needed = min(float(tokens), self.token_capacity)
+            if self._llm_tokens < needed:
+                return (needed - self._llm_tokens) / self.token_rate
+            self._llm_tokens -= tokens
+
+        self._tokens -= 1
+        self.in_flight += 1
+        return 0.0
+
+    def _enqueue(self, waiter: "_Waiter"):
+        with self._lock:
+            self._waiters.append(waiter)
+
+    def _enter(self, waiter: "_Waiter", tokens: int) -> Optional[float]:
+        """대기열 맨 앞이면 슬롯을 시도 (반환값은 _try_acquire와 같음, 맨 앞이 아니면 None)"""
+        with self._lock:
+            if self._waiters[0] is not waiter:
+                return None
+            wait = self._try_acquire(tokens)
+            if wait == 0:
+                self._waiters.popleft()
+                self._wake_next()
+            return wait
+
+    def _leave(self, waiter: "_Waiter"):
+        """슬롯을 얻기 전에 취소된 요청을 대기열에서 제거"""
+        with self._lock:
+            head = bool(self._waiters) and self._waiters[0] is waiter
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                return
+            if head:
+                self._wake_next()
+
+    def _wake_next(self):
+        if self._waiters:
+            self._waiters[0].wake()
+
+    def record_tokens(self, estimated: int, actual: Optional[int]):
+        """응답의 실제 토큰 사용량으로 슬롯을 잡을 때 뺀 예상 토큰 수를 정산"""
+        if not self.token_rate or actual is None:
+            return
+        with self._lock:
+            self._llm_tokens = min(self.token_capacity, self._llm_tokens + estimated - actual)
+
+    def _release(self, outcome: Optional[str]):
+        with self._lock:
+            self.in_flight -= 1
+            self._wake_next()
+            if outcome in (THROTTLED, SERVER_ERROR):
+                previous = self.limit
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                if int(previous) != int(self.limit):
+                    logging.warning(f"[{self.name}] {outcome} → 동시 요청 한도 {int(previous)} → {int(self.limit)}")
+            elif outcome is None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        """
+        Args:
+            tokens: 이번 호출의 예상 LLM 토큰 수 (분당 토큰 예산에서 차감)
+        """
+        waiter = _Waiter(asyncio.get_running_loop())
+        self._enqueue(waiter)
+        try:
+            while True:
+                wait = self._enter(waiter, tokens)
+                if wait == 0:
+                    break
+                await waiter.wait(wait)
+        except BaseException:
+            self._leave(waiter)
+            raise
+        outcome = None
+        try:
+            with track_upstream(self.name):
+                yield
+        except Exception as e:
+            outcome = classify_error(e) or "error"
+            record_upstream_error(self.name, outcome)
+            raise
+        finally:
+            self._release(outcome)
+
+    @contextmanager
+    def sync_slot(self, tokens: int = 0):
+        waiter = _Waiter()
+        self._enqueue(waiter)
+        try:
+            while True:
+                wait = self._enter(waiter, tokens)
+                if wait == 0:
+                    break
+                waiter.wait_sync(wait)
+        except BaseException:
+            self._leave(waiter)
+            raise
+        outcome = None
+        try:
+            with track_upstream(self.name):
+                yield
+        except Exception as e:
+            outcome = classify_error(e) or "error"
+            record_upstream_error(self.name, outcome)
+            raise
+        finally:
+            self._release(outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "requests_per_minute": round(self.rate * 60),
+        }
+        if self.token_rate:
+            stats["tokens_per_minute"] = round(self.token_rate * 60)
+        return stats
+
+
+class _Waiter:
+    """슬롯 대기열의 요청 하나 (이벤트 루프의 코루틴 또는 동기 스레드)"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = asyncio.Event() if loop is not None else threading.Event()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+            return
+        try:
+            # 다른 스레드/이벤트 루프에서 슬롯을 반납해도 깨울 수 있도록 해당 루프에서 실행
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # 이미 닫힌 이벤트 루프
+            pass
+
+    async def wait(self, timeout: Optional[float]):
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout or _MAX_IDLE_WAIT)
+        except asyncio.TimeoutError:
+            pass
+        self.event.clear()
+
+    def wait_sync(self, timeout: Optional[float]):
+        self.event.wait(timeout or _MAX_IDLE_WAIT)
+        self.event.clear()
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(upstream: str) -> UpstreamLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(upstream)
+        if limiter is None:
+            rpm, concurrency = DEFAULT_LIMITS.get(upstream, (60, 4))
+            rpm = float(os.getenv(f"RATE_LIMIT_{upstream.upper()}_RPM", rpm))
+            concurrency = int(os.getenv(f"RATE_LIMIT_{upstream.upper()}_CONCURRENCY", concurrency))
+            burst = os.getenv(f"RATE_LIMIT_{upstream.upper()}_BURST", DEFAULT_BURSTS.get(upstream))
+            tpm = os.getenv(f"RATE_LIMIT_{upstream.upper()}_TPM", DEFAULT_TOKEN_LIMITS.get(upstream))
+            limiter = UpstreamLimiter(
+                upstream,
+                rpm,
+                concurrency,
+                burst=float(burst) if burst is not None else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+            )
+            _limiters[upstream] = limiter
+        return limiter
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    if isinstance(status, int):
+        return status
+    # Tavily 등 일부 클라이언트는 "Error 429: Too Many Requests" 형태의 메시지만 제공
+    match = re.match(r"Error (429|5\d\d)\b", str(error))
+    return int(match.group(1)) if match else None
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """재시도 대상이면 THROTTLED / SERVER_ERROR, 아니면 None"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return SERVER_ERROR
+    name = type(error).__name__
+    if "Timeout" in name or "Connect" in name:
+        return SERVER_ERROR
+    status = _status_code(error)
+    if status == 429:
+        return THROTTLED
+    if status is not None and 500 <= status < 600:
+        return SERVER_ERROR
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, error: Exception) -> float:
+    # full jitter: 0 ~ min(최대 대기, 기본 대기 * 2^attempt) 사이 임의 시간
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+    retry_after = _retry_after(error)
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+def retry_delay(upstream: str, attempt: int, error: Exception) -> Optional[float]:
+    """
+    attempt번째 시도가 error로 실패했을 때 재시도 전 기다릴 시간(초)
+
+    재시도 대상이 아니거나 마지막 시도였으면 None (호출한 쪽에서 예외를 그대로 올림)
+    """
+    if classify_error(error) is None or attempt >= RETRY_MAX_ATTEMPTS - 1:
+        return None
+    delay = _backoff(attempt, error)
+    logging.warning(f"[{upstream}] 요청 실패 ({error}), {delay:.1f}초 후 재시도 ({attempt + 1}/{RETRY_MAX_ATTEMPTS - 1})")
+    record_upstream_retry(upstream)
+    return delay
+
+
+async def call_with_retry(
+    upstream: str, func: Callable[..., Awaitable[Any]], *args, tokens: int = 0, **kwargs
+) -> Any:
+    """
+    업스트림 한도 안에서 비동기 함수를 호출하고, 429/5xx/타임아웃이면 지터를 둔 지수 백오프로 재시도
+
+    Args:
+        upstream: "openai" / "tavily" / "kipris" / "arxiv" 등
+        func: 호출할 코루틴 함수 (재시도 시 다시 호출됨)
+        tokens: 호출 1회의 예상 LLM 토큰 수 (시도마다 슬롯과 함께 다시 잡음)
+    """
+    limiter = get_limiter(upstream)
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        try:
+            async with limiter.slot(tokens):
+                return await func(*args, **kwargs)
+        except Exception as e:
+            delay = retry_delay(upstream, attempt, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+def call_with_retry_sync(upstream: str, func: Callable[..., Any], *args, tokens: int = 0, **kwargs) -> Any:
+    """call_with_retry의 동기 버전 (워커 스레드에서 실행되는 호출용)"""
+    limiter = get_limiter(upstream)
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        try:
+            with limiter.sync_slot(tokens):
+                return func(*args, **kwargs)
+        except Exception as e:
+            delay = retry_delay(upstream, attempt, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
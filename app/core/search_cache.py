@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from app.core.sqlite_lru import evict_lru
+
+# 검색 캐시 저장 위치 및 최대 항목 수
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join("output", "cache", "search_cache.sqlite3"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+SEARCH_CACHE_DEFAULT_TTL = int(os.getenv("SEARCH_CACHE_DEFAULT_TTL", str(24 * 3600)))
+
+# 검색 출처(에이전트)별 TTL (초) - SEARCH_CACHE_TTL_<SOURCE> 환경 변수로 덮어쓸 수 있음
+SOURCE_TTLS = {
+    "explorer": 6 * 3600,          # 스타트업 탐색: 최신 기사 위주
+    "info_perform": 24 * 3600,     # 실적/창업자 정보
+    "competitor": 3 * 24 * 3600,   # 경쟁사 목록/비교
+    "market": 3 * 24 * 3600,       # 시장 규모/트렌드
+}
+
+
+def normalize_query(query: str) -> str:
+    """대소문자와 공백 차이를 무시하도록 검색어 정규화"""
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+
+def get_source_ttl(source: str) -> int:
+    env_value = os.getenv(f"SEARCH_CACHE_TTL_{source.upper()}")
+    if env_value is not None:
+        return int(env_value)
+    return SOURCE_TTLS.get(source, SEARCH_CACHE_DEFAULT_TTL)
+
+
+class SearchCache:
+    """
+    웹 검색 결과를 SQLite에 저장하는 디스크 캐시
+
+    - 키: 정규화된 검색어 + 최대 결과 수 (에이전트 간 공유)
+    - 만료: 조회하는 출처(source)의 TTL 기준
+    - 크기 제한: max_entries 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed ON search_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, max_results: int) -> str:
+        return f"{max_results}:{normalize_query(query)}"
+
+    def get(self, source: str, query: str, max_results: int) -> Optional[Any]:
+        key = self.make_key(query, max_results)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM search_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > get_source_ttl(source):
+                self._misses[source] += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET last_accessed = ? WHERE cache_key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._hits[source] += 1
+        return json.loads(row[0])
+
+    def set(self, source: str, query: str, max_results: int, value: Any):
+        key = self.make_key(query, max_results)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache (cache_key, source, value, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, source, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        removed = evict_lru(self._conn, "search_cache", self.max_entries)
+        if removed:
+            logging.info(f"검색 캐시 {removed}건 삭제 (최대 {self.max_entries}건)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            sources = sorted(set(self._hits) | set(self._misses))
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": sum(self._hits.values()),
+                "misses": sum(self._misses.values()),
+                "by_source": {
+                    source: {"hits": self._hits[source], "misses": self._misses[source]}
+                    for source in sources
+                },
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """프로세스 전체에서 공유하는 검색 캐시 반환"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
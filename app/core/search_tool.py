@@ -0,0 +1,110 @@
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_community.tools.tavily_search import TavilySearchResults
+
+from app.core.evidence_store import get_evidence_store
+from app.core.rate_limit import call_with_retry, call_with_retry_sync
+from app.core.search_cache import get_search_cache
+from app.core.workers import run_sync
+
+
+class CachedTavilySearchResults(TavilySearchResults):
+    """
+    실행 단위 근거 저장소와 검색 캐시를 먼저 확인하는 TavilySearchResults
+
+    supervisor 실행 중이면 다른 에이전트가 이미 가져온 자료로 답할 수 있는지 먼저 확인하고,
+    캐시에도 없을 때만 업스트림 한도("tavily") 안에서 Tavily API를 호출하며,
+    LangChain 도구 인터페이스(invoke/ainvoke, AgentExecutor의 tools)는 그대로 유지됨
+    """
+
+    source: str = "default"
+
+    def _search_args(self, query: str) -> tuple:
+        return (
+            query,
+            self.max_results,
+            self.search_depth,
+            self.include_domains,
+            self.exclude_domains,
+            self.include_answer,
+            self.include_raw_content,
+            self.include_images,
+        )
+
+    def _run(
+        self,
+        query: str,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        evidence = get_evidence_store()
+        if evidence is not None:
+            found = evidence.lookup(query, self.max_results, self.source)
+            if found is not None:
+                return found, {"query": query, "results": found}
+
+        content, raw_results = self._search(query)
+        if evidence is not None:
+            evidence.add(content, query, self.source, self.max_results)
+        return content, raw_results
+
+    def _search(self, query: str) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        cache = get_search_cache()
+        cached = cache.get(self.source, query, self.max_results)
+        if cached is not None:
+            logging.info(f"[{self.source}] 검색 캐시 사용: {query}")
+            return cached[0], cached[1]
+
+        try:
+            raw_results = call_with_retry_sync("tavily", self.api_wrapper.raw_results, *self._search_args(query))
+        except Exception as e:
+            # TavilySearchResults와 동일하게 오류는 문자열로 반환 (캐시하지 않음)
+            return repr(e), {}
+        content = self.api_wrapper.clean_results(raw_results["results"])
+        cache.set(self.source, query, self.max_results, [content, raw_results])
+        return content, raw_results
+
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        evidence = get_evidence_store()
+        if evidence is not None:
+            found = await evidence.alookup(query, self.max_results, self.source)
+            if found is not None:
+                return found, {"query": query, "results": found}
+
+        content, raw_results = await self._asearch(query)
+        if evidence is not None:
+            await evidence.aadd(content, query, self.source, self.max_results)
+        return content, raw_results
+
+    async def _asearch(self, query: str) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        cache = get_search_cache()
+        cached = await run_sync(cache.get, self.source, query, self.max_results)
+        if cached is not None:
+            logging.info(f"[{self.source}] 검색 캐시 사용: {query}")
+            return cached[0], cached[1]
+
+        try:
+            raw_results = await call_with_retry(
+                "tavily", self.api_wrapper.raw_results_async, *self._search_args(query)
+            )
+        except Exception as e:
+            return repr(e), {}
+        content = self.api_wrapper.clean_results(raw_results["results"])
+        await run_sync(cache.set, self.source, query, self.max_results, [content, raw_results])
+        return content, raw_results
+
+
+def get_search_tool(source: str, max_results: int = 5) -> CachedTavilySearchResults:
+    """
+    에이전트용 Tavily 검색 도구 생성
+
+    Args:
+        source: 검색 출처(에이전트) 이름 - 캐시 TTL 및 hit/miss 통계 구분에 사용
+        max_results: 최대 검색 결과 수
+    """
+    return CachedTavilySearchResults(max_results=max_results, source=source)
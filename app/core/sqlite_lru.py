@@ -0,0 +1,53 @@
+import sqlite3
+from typing import Optional
+
+# 한도를 넘으면 한도의 이 비율까지 줄여서, 쓰기마다 삭제가 반복되지 않도록 함
+LRU_EVICT_TARGET = 0.9
+
+
+def evict_lru(
+    conn: sqlite3.Connection,
+    table: str,
+    max_entries: int,
+    max_bytes: Optional[int] = None,
+) -> int:
+    """
+    항목 수(max_entries) 또는 전체 크기(max_bytes) 한도를 넘은 SQLite 캐시 테이블에서
+    가장 오래 사용되지 않은 항목부터 삭제하고 삭제한 건수 반환
+
+    테이블에는 cache_key, last_accessed 컬럼과 last_accessed 인덱스가 있어야 하고,
+    max_bytes를 쓰면 size 컬럼도 필요함. 삭제할 항목만 인덱스 순서로 읽은 뒤 DELETE 한 번으로 지움
+    (호출한 쪽의 lock/트랜잭션 안에서 호출)
+    """
+    if max_bytes is None:
+        (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        total_size = 0
+    else:
+        count, total_size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+    if count <= max_entries and (max_bytes is None or total_size <= max_bytes):
+        return 0
+
+    target_entries = int(max_entries * LRU_EVICT_TARGET)
+    removed = max(0, count - target_entries)
+    if max_bytes is not None:
+        target_bytes = int(max_bytes * LRU_EVICT_TARGET)
+        removed = 0
+        cursor = conn.execute(f"SELECT size FROM {table} ORDER BY last_accessed ASC")
+        try:
+            for (size,) in cursor:
+                if count - removed <= target_entries and total_size <= target_bytes:
+                    break
+                removed += 1
+                total_size -= size
+        finally:
+            cursor.close()
+
+    conn.execute(
+        f"""
+        DELETE FROM {table} WHERE cache_key IN (
+            SELECT cache_key FROM {table} ORDER BY last_accessed ASC LIMIT ?
+        )
+        """,
+        (removed,),
+    )
+    return removed
@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+_stores: Dict[Tuple[str, str], object] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(
+    persist_directory: str,
+    embedding_factory: Callable[[], Embeddings],
+    collection_name: str = "langchain",
+):
+    """
+    저장된 Chroma 벡터 DB를 프로세스당 한 번만 열고 재사용
+
+    Args:
+        persist_directory: 벡터 DB 저장 경로 (절대 경로로 정규화하여 키로 사용)
+        embedding_factory: 처음 열 때만 호출되는 임베딩 생성 함수
+        collection_name: Chroma 컬렉션 이름
+
+    같은 경로를 다시 요청하면 처음 연 핸들을 반환하므로 embedding_factory는 무시됨
+    Chroma 조회는 여러 스레드에서 동시에 호출해도 안전함
+    """
+    from langchain_chroma import Chroma
+
+    key = (os.path.abspath(persist_directory), collection_name)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            logging.info(f"벡터 DB 열기: {key[0]} ({collection_name})")
+            store = Chroma(
+                persist_directory=key[0],
+                embedding_function=embedding_factory(),
+                collection_name=collection_name,
+            )
+            _stores[key] = store
+        return store
+
+
+def close_vector_stores():
+    """애플리케이션 종료 시 열린 벡터 DB 핸들 정리"""
+    with _stores_lock:
+        for (path, _), store in _stores.items():
+            client = getattr(store, "_client", None)
+            close = getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logging.warning(f"벡터 DB 종료 실패 ({path}): {e}")
+        _stores.clear()
@@ -0,0 +1,44 @@
+import importlib
+import logging
+import os
+import time
+
+# 서버 시작 시 미리 불러올 모듈 (첫 요청에서 import 비용을 내지 않도록)
+WARMUP_MODULES = [
+    "app.agents.open_ai",
+    "app.agents.info_perform_agent",
+    "app.agents.competitor_compare_agent",
+    "app.agents.market_agent",
+    "app.agents.invest_agent",
+    "app.agents.tech_summary_agent",
+    "app.agents.vectorize_papers_agent",
+    "app.agents.generate_report_agent",
+    "app.agents.startup_explorer_agent",
+]
+
+
+def warm_up():
+    """
+    무거운 모듈, 임베딩 모델, 벡터 DB를 미리 로딩
+
+    WARMUP_ON_STARTUP=1이면 서버 시작 시 호출되며, 그렇지 않으면 첫 요청 시 지연 로딩됨
+    """
+    started = time.perf_counter()
+    for name in WARMUP_MODULES:
+        module_started = time.perf_counter()
+        importlib.import_module(name)
+        logging.info(f"warm-up import {name}: {time.perf_counter() - module_started:.2f}s")
+
+    from app.agents.invest_agent import baseline_provider
+    from app.agents.vectorize_papers_agent import PAPERS_DB_DIR
+    from app.core.embeddings import get_openai_embeddings
+    from app.core.hybrid_search import get_keyword_index
+    from app.core.vector_stores import get_vector_store
+
+    # 임베딩 모델 로딩 + 업계 평균 벤치마크 계산
+    baseline_provider.warm_up()
+    # 논문 벡터 DB가 이미 있으면 핸들을 열고 하이브리드 검색용 키워드 색인도 미리 만듦
+    if os.path.isdir(PAPERS_DB_DIR):
+        get_keyword_index(get_vector_store(PAPERS_DB_DIR, get_openai_embeddings))
+
+    logging.info(f"warm-up 완료: {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 동기 전용 라이브러리(ReportLab, Chroma 등)를 실행할 공용 워커 풀 크기
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "8"))
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """프로세스 전체에서 공유하는 워커 스레드 풀 반환 (최초 사용 시 생성)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=WORKER_POOL_SIZE, thread_name_prefix="agent-worker"
+        )
+    return _executor
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    동기 함수를 이벤트 루프 밖의 워커 풀에서 실행
+
+    contextvars를 복사해서 넘기므로 요청 단위 설정이 워커 스레드에서도 유지됨
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def shutdown_executor():
+    """애플리케이션 종료 시 워커 풀 정리"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,18 +1,48 @@
 import logging
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from app.api import openai_router
+from app.core.http_client import close_http_clients
+from app.core.jobs import job_manager
+from app.core.llm_cache import configure_llm_cache
+from app.core.metrics import render_metrics
+from app.core.vector_stores import close_vector_stores
+from app.core.warmup import warm_up
+from app.core.workers import run_sync, shutdown_executor
 
 load_dotenv()
 
-app = FastAPI()
+# 에이전트 체인 응답 캐시 (LLM_CACHE=sqlite|memory|off)
+configure_llm_cache()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 기본은 첫 요청 시 지연 로딩, WARMUP_ON_STARTUP=1이면 요청을 받기 전에 미리 로딩
+    if os.getenv("WARMUP_ON_STARTUP", "0") == "1":
+        await run_sync(warm_up)
+    yield
+    # 종료 시 공유 리소스 정리
+    job_manager.cancel_all()
+    close_vector_stores()
+    await close_http_clients()
+    shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus 수집용: 에이전트/업스트림/모델별 지연 시간, 처리 중 요청 수, 오류 수, 토큰 수
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
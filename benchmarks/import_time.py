@@ -0,0 +1,100 @@
+"""
+모듈별 import 시간 측정
+
+각 모듈을 새 파이썬 프로세스에서 `-X importtime`으로 import하여
+콜드 스타트 시 누적 import 비용을 측정합니다.
+
+실행:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 3 --json import_time.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "app.main",
+    "app.api.openai_router",
+    "app.agents.open_ai",
+    "app.agents.info_perform_agent",
+    "app.agents.competitor_compare_agent",
+    "app.agents.market_agent",
+    "app.agents.invest_agent",
+    "app.agents.tech_summary_agent",
+    "app.agents.vectorize_papers_agent",
+    "app.agents.generate_report_agent",
+    "app.agents.startup_explorer_agent",
+]
+
+# -X importtime 출력 형식: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def measure(module):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.setdefault("TAVILY_API_KEY", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+
+    # 가장 무거운 서드파티 최상위 패키지 (app.* 제외)
+    top_level = {}
+    for name, us in cumulative.items():
+        root = name.split(".")[0]
+        if root != "app":
+            top_level[root] = max(top_level.get(root, 0), us)
+    heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:3]
+
+    return {
+        "module": module,
+        "cumulative_ms": cumulative.get(module, 0) / 1000,
+        "heaviest": [{"package": name, "ms": us / 1000} for name, us in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 측정")
+    parser.add_argument("--repeat", type=int, default=1, help="모듈별 측정 횟수 (최솟값 사용)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        ok_runs = [run for run in runs if "error" not in run]
+        results.append(min(ok_runs, key=lambda run: run["cumulative_ms"]) if ok_runs else runs[0])
+
+    print(f"{'module':<42} {'import(ms)':>10}  heaviest dependencies")
+    for result in results:
+        if "error" in result:
+            print(f"{result['module']:<42} {'ERROR':>10}  {result['error']}")
+            continue
+        heaviest = ", ".join(f"{h['package']} {h['ms']:.0f}ms" for h in result["heaviest"])
+        print(f"{result['module']:<42} {result['cumulative_ms']:>10.0f}  {heaviest}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
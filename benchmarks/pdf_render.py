@@ -0,0 +1,129 @@
+"""
+보고서 PDF 렌더링 시간 및 최대 메모리 측정
+
+제목/문단/중첩 목록/표/코드 블록이 섞인 합성 Markdown 보고서를 페이지 수별로 만들어
+convert_report_to_pdf의 렌더링 시간과 최대 메모리 사용량(tracemalloc)을 측정합니다.
+시간은 tracemalloc 없이 따로 측정합니다 (tracemalloc은 실행을 느리게 함).
+
+실행:
+    python benchmarks/pdf_render.py
+    python benchmarks/pdf_render.py --pages 10 100 --repeat 3 --json pdf_render.json
+"""
+import argparse
+import gc
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+PAGE_COUNTS = [10, 50, 100, 250, 500]
+
+# 생성된 PDF의 실제 페이지 수 확인용 (ReportLab 기본 설정은 페이지 객체를 압축하지 않음)
+PDF_PAGE_RE = re.compile(rb"/Type /Page\b")
+
+# A4 약 한 페이지 분량의 합성 보고서 섹션 (page 번호로 치환)
+SECTION = """## {page}. 시장성 분석
+
+**{page}.1 시장 규모** 국내 AI 시장은 연평균 **25%** 성장하여 2028년 약 *4조 원* 규모에 이를 것으로 전망됩니다. \
+주요 근거는 [산업 전망 보고서](https://example.com/report/{page})와 `TAM/SAM/SOM` 추정치이며, 경쟁 강도는 높음 & 진입장벽은 중간 수준입니다.
+
+- 성장 동인
+  - 생성형 AI 도입 확대와 클라우드 비용 하락
+  - 규제 샌드박스 및 정부 R&D 지원
+    - 2025년 AI 바우처 예산 증가
+- 위험 요인
+  1. 대형 플랫폼 기업의 시장 진입
+  2. 데이터 확보 비용 증가
+
+| 항목 | 값 | 비고 |
+| --- | ---: | :--- |
+| TAM | 4조 원 | 2028년 기준 |
+| SAM | 8,000억 원 | B2B SaaS |
+| SOM | 400억 원 | 점유율 5% |
+
+```
+score = 0.4 * market + 0.3 * tech + 0.3 * team
+```
+
+해당 기업은 독자적인 경량화 모델과 도메인 특화 데이터를 바탕으로 차별화된 경쟁 우위를 확보하고 있으며, \
+PoC 결과를 토대로 한 상용화 속도가 빠른 편입니다. 다만 매출 대부분이 소수 고객에 집중되어 있어 고객 다변화가 필요합니다.
+
+### {page}.2 경쟁 구도
+
+경쟁사 대비 추론 비용이 약 30% 낮고, 온프레미스 배포를 지원해 금융·공공 고객의 보안 요구를 충족합니다. 반면 글로벌 빅테크의 범용 모델 성능이 빠르게 향상되고 있어, 도메인 특화 데이터와 워크플로 통합을 통한 고객 락인 전략이 중요합니다. 향후 3년간 해외 매출 비중을 20% 이상으로 높이는 것이 목표입니다.
+
+1. 투자 포인트
+   - 반복 매출(ARR) 비중 70% 이상
+   - 핵심 인력 이탈률 5% 미만
+2. 확인 필요 사항
+   - 주요 고객 계약 갱신 조건
+
+---
+"""
+
+
+def synthetic_report(pages):
+    return "**스타트업 투자 검토 보고서**\n\n" + "\n".join(SECTION.format(page=i + 1) for i in range(pages))
+
+
+def measure(pages, repeat):
+    from app.agents.generate_report_agent import convert_report_to_pdf, get_pdf_styles
+
+    # 폰트 등록은 프로세스당 한 번이므로 측정에서 제외
+    get_pdf_styles()
+    content = synthetic_report(pages)
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        pdf_bytes = convert_report_to_pdf(content)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    convert_report_to_pdf(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "pages": pages,
+        "pdf_pages": len(PDF_PAGE_RE.findall(pdf_bytes)),
+        "markdown_kb": len(content.encode("utf-8")) / 1024,
+        "pdf_kb": len(pdf_bytes) / 1024,
+        "seconds": min(timings),
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보고서 PDF 렌더링 시간 및 최대 메모리 측정")
+    parser.add_argument("--pages", type=int, nargs="*", default=PAGE_COUNTS, help="측정할 합성 보고서 페이지 수")
+    parser.add_argument("--repeat", type=int, default=1, help="페이지 수별 측정 횟수 (최솟값 사용)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'pages':>6} {'pdf pages':>10} {'markdown(KB)':>13} {'pdf(KB)':>9} {'time(s)':>9} {'s/page':>8} {'peak(MB)':>9}")
+    for pages in args.pages:
+        result = measure(pages, args.repeat)
+        results.append(result)
+        print(
+            f"{result['pages']:>6} {result['pdf_pages']:>10} {result['markdown_kb']:>13.0f} {result['pdf_kb']:>9.0f} "
+            f"{result['seconds']:>9.2f} {result['seconds'] / max(1, result['pdf_pages']):>8.3f} {result['peak_mb']:>9.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()